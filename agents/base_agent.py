@@ -1,26 +1,292 @@
+import asyncio
+import json
+import time
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, List, NamedTuple, Optional, Tuple, Type, TypeVar
+from pydantic import BaseModel, ValidationError
 from langchain_openai import ChatOpenAI
-from langchain.schema import SystemMessage, HumanMessage
+from langchain.schema import BaseMessage, SystemMessage, HumanMessage
 from config.settings import settings
+from .timeline import stage
+from .llm_resilience import (
+    TRANSIENT_ERRORS, DeadlineExceeded, backoff_delay, latency_tracker,
+    llm_stats, record_attempt, remaining_time
+)
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+class LLMRoute(NamedTuple):
+    model: str
+    max_tokens: int
+    temperature: float
+
+
+# Responses of deterministic (temperature 0) routes, shared by all agents
+_response_cache: "OrderedDict[Tuple[LLMRoute, str, str], str]" = OrderedDict()
+
+# Process-wide cap on in-flight LLM calls, so fan-out (chunked reviews, title batches) can't flood the API
+_llm_slots = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY)
+
 
 class BaseAgent(ABC):
+    # One client per distinct route, shared across agent instances
+    _llm_clients: Dict[LLMRoute, ChatOpenAI] = {}
+
     def __init__(self, agent_name: str):
         self.agent_name = agent_name
-        self.llm = ChatOpenAI(
-            model=settings.MODEL_NAME,
-            temperature=settings.TEMPERATURE,
-            max_tokens=settings.MAX_TOKENS,
-            api_key=settings.OPENAI_API_KEY
-        )
-    
+
     @abstractmethod
     async def execute(self, input_data: dict) -> dict:
         pass
-    
-    async def _call_llm(self, system_prompt: str, user_prompt: str) -> str:
+
+    async def _call_llm(self, system_prompt: str, user_prompt: str, task: str = "default") -> str:
+        messages = [
+            SystemMessage(content=system_prompt),
+            HumanMessage(content=user_prompt)
+        ]
+        key = f"{self.agent_name}.{task}"
+        route = self._resolve_route(task)
+        llm_stats.incr(key, "calls")
+
+        cache_key = (route, system_prompt, user_prompt)
+        if route.temperature == 0 and cache_key in _response_cache:
+            llm_stats.incr(key, "cache_hits")
+            _response_cache.move_to_end(cache_key)
+            return _response_cache[cache_key]
+
+        llm = self._get_llm(route)
+        try:
+            return await self._call_with_retries(key, route, cache_key, llm, messages)
+        except asyncio.CancelledError:
+            # The request was abandoned (deadline or client disconnect) mid-call
+            llm_stats.incr(key, "cancelled")
+            raise
+
+    async def _call_with_retries(self, key: str, route: LLMRoute, cache_key: Tuple[LLMRoute, str, str],
+                                 llm: ChatOpenAI, messages: List[BaseMessage]) -> str:
+        for attempt in range(settings.LLM_MAX_RETRIES + 1):
+            timeout = self._attempt_timeout(key)
+            try:
+                result = await self._invoke_with_hedge(key, llm, messages, timeout)
+                if route.temperature == 0:
+                    _response_cache[cache_key] = result
+                    if len(_response_cache) > settings.LLM_RESPONSE_CACHE_SIZE:
+                        _response_cache.popitem(last=False)
+                return result
+            except TRANSIENT_ERRORS as e:
+                await self._backoff(key, attempt, e)
+
+    async def _backoff(self, key: str, attempt: int, error: Exception):
+        """Sleep before the next attempt, or re-raise `error` when out of attempts or time."""
+        if isinstance(error, asyncio.TimeoutError):
+            llm_stats.incr(key, "timeouts")
+        if attempt == settings.LLM_MAX_RETRIES:
+            llm_stats.incr(key, "failures")
+            raise error
+        delay = backoff_delay(attempt, settings.LLM_BACKOFF_BASE, settings.LLM_BACKOFF_MAX)
+        remaining = remaining_time()
+        if remaining is not None and remaining <= delay:
+            llm_stats.incr(key, "deadline_exceeded")
+            raise DeadlineExceeded(f"Request deadline reached during {key}") from error
+        llm_stats.incr(key, "retries")
+        await asyncio.sleep(delay)
+
+    async def _stream_llm(self, system_prompt: str, user_prompt: str,
+                          task: str = "default") -> AsyncIterator[str]:
+        """Yield response text as it is generated; retried only while nothing has been yielded."""
         messages = [
             SystemMessage(content=system_prompt),
             HumanMessage(content=user_prompt)
         ]
-        response = await self.llm.ainvoke(messages)
-        return response.content
\ No newline at end of file
+        key = f"{self.agent_name}.{task}"
+        llm = self._get_llm(self._resolve_route(task))
+        llm_stats.incr(key, "calls")
+
+        # A reader task drains the stream into a queue, so the LLM slot is released as soon as
+        # the response ends rather than held while the consumer works between chunks
+        chunks: asyncio.Queue = asyncio.Queue()
+        reader = asyncio.ensure_future(self._read_stream(key, llm, messages, chunks))
+        try:
+            while True:
+                chunk = await chunks.get()
+                if chunk is None:
+                    break
+                yield chunk
+            await reader  # re-raises the stream's error, if any
+        except asyncio.CancelledError:
+            llm_stats.incr(key, "cancelled")
+            raise
+        finally:
+            reader.cancel()
+
+    async def _read_stream(self, key: str, llm: ChatOpenAI, messages: List[BaseMessage],
+                           chunks: asyncio.Queue):
+        """Queue the response's text chunks, then None when the stream ends or fails."""
+        try:
+            for attempt in range(settings.LLM_MAX_RETRIES + 1):
+                received = False
+                try:
+                    async with _llm_slots:
+                        llm_stats.incr(key, "attempts")
+                        record_attempt()
+                        started = time.monotonic()
+                        with stage(f"llm {key}"):
+                            stream = llm.astream(messages).__aiter__()
+                            while True:
+                                # The timeout bounds each gap between chunks, so a stalled stream fails fast
+                                try:
+                                    chunk = await asyncio.wait_for(
+                                        stream.__anext__(), self._attempt_timeout(key)
+                                    )
+                                except StopAsyncIteration:
+                                    break
+                                received = True
+                                chunks.put_nowait(chunk.content)
+                        latency_tracker.record(key, time.monotonic() - started)
+                    return
+                except TRANSIENT_ERRORS as e:
+                    if received:
+                        llm_stats.incr(key, "failures")
+                        raise
+                    await self._backoff(key, attempt, e)
+        finally:
+            chunks.put_nowait(None)
+
+    async def _call_llm_structured(self, system_prompt: str, user_prompt: str,
+                                   schema: Type[ModelT], task: str = "default") -> ModelT:
+        """Fetch all fields of `schema` in one call, repairing invalid JSON instead of re-running."""
+        schema_json = json.dumps(schema.model_json_schema())
+        structured_prompt = (
+            f"{system_prompt}\n\nRespond with a single JSON object that validates against "
+            f"this JSON schema, and nothing else:\n{schema_json}"
+        )
+        raw = await self._call_llm(structured_prompt, user_prompt, task=task)
+
+        key = f"{self.agent_name}.{task}"
+        for attempt in range(settings.LLM_STRUCTURED_REPAIRS + 1):
+            try:
+                return schema.model_validate(self._extract_json(raw))
+            except (ValueError, ValidationError) as e:
+                if attempt == settings.LLM_STRUCTURED_REPAIRS:
+                    raise
+                # Send back only the broken output and its errors, not the original task
+                llm_stats.incr(key, "repairs")
+                raw = await self._call_llm(
+                    "You fix JSON so it validates against a JSON schema. "
+                    "Change only what the errors require and return only the corrected JSON.",
+                    f"Schema:\n{schema_json}\n\nInvalid output:\n{raw}\n\nErrors:\n{self._describe_errors(e)}",
+                    task=f"{task}.repair"
+                )
+
+    @staticmethod
+    def _extract_json(raw: str) -> dict:
+        # Tolerate markdown fences and chatter around the object
+        start, end = raw.find("{"), raw.rfind("}")
+        if start == -1 or end < start:
+            raise ValueError("No JSON object found in response")
+        return json.loads(raw[start:end + 1])
+
+    @staticmethod
+    def _describe_errors(error: Exception) -> str:
+        if isinstance(error, ValidationError):
+            return "\n".join(
+                f"- {'.'.join(str(part) for part in err['loc']) or '<root>'}: {err['msg']}"
+                for err in error.errors()
+            )
+        return f"- {error}"
+
+    def _resolve_route(self, task: str) -> LLMRoute:
+        # Most specific entry wins: "<Agent>.<task>", then "<Agent>", then defaults
+        overrides = {
+            **settings.LLM_ROUTES.get(self.agent_name, {}),
+            **settings.LLM_ROUTES.get(f"{self.agent_name}.{task}", {})
+        }
+        return LLMRoute(
+            model=overrides.get("model", settings.MODEL_NAME),
+            max_tokens=overrides.get("max_tokens", settings.MAX_TOKENS),
+            temperature=overrides.get("temperature", settings.TEMPERATURE)
+        )
+
+    def _get_llm(self, route: LLMRoute) -> ChatOpenAI:
+        if route not in self._llm_clients:
+            self._llm_clients[route] = self._build_llm(route)
+        return self._llm_clients[route]
+
+    def _build_llm(self, route: LLMRoute) -> ChatOpenAI:
+        return ChatOpenAI(
+            model=route.model,
+            temperature=route.temperature,
+            max_tokens=route.max_tokens,
+            api_key=settings.OPENAI_API_KEY,
+            max_retries=0  # retries are handled by _call_llm
+        )
+
+    def _attempt_timeout(self, key: str) -> float:
+        timeout = settings.LLM_TIMEOUT
+        remaining = remaining_time()
+        if remaining is not None:
+            if remaining <= 0:
+                llm_stats.incr(key, "deadline_exceeded")
+                raise DeadlineExceeded(f"No time left for {key}")
+            timeout = min(timeout, remaining)
+        return timeout
+
+    async def _invoke_with_hedge(self, key: str, llm: ChatOpenAI,
+                                 messages: List[BaseMessage], timeout: float) -> str:
+        hedge_after = self._hedge_delay(key, timeout)
+        primary = asyncio.ensure_future(self._timed_invoke(key, llm, messages))
+        if hedge_after is None:
+            return await asyncio.wait_for(primary, timeout)
+
+        # Launch a duplicate once the primary exceeds the observed tail latency
+        started = time.monotonic()
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=hedge_after)
+            if done:
+                return primary.result()
+
+            llm_stats.incr(key, "hedges_launched")
+            hedge = asyncio.ensure_future(self._timed_invoke(key, llm, messages))
+            tasks.append(hedge)
+            pending = {primary, hedge}
+            while pending:
+                budget = timeout - (time.monotonic() - started)
+                done, pending = await asyncio.wait(
+                    pending, timeout=max(budget, 0), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    raise asyncio.TimeoutError()
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            llm_stats.incr(key, "hedges_won")
+                        return task.result()
+            # Both calls failed; surface the primary's error
+            return primary.result()
+        finally:
+            # Cancel the loser (or both on timeout/cancellation)
+            for task in tasks:
+                task.cancel()
+
+    def _hedge_delay(self, key: str, timeout: float) -> Optional[float]:
+        if not settings.LLM_HEDGE_ENABLED:
+            return None
+        p95 = latency_tracker.percentile(
+            key, settings.LLM_HEDGE_PERCENTILE, settings.LLM_HEDGE_MIN_SAMPLES
+        )
+        if p95 is None or p95 >= timeout:
+            return None
+        return p95
+
+    async def _timed_invoke(self, key: str, llm: ChatOpenAI, messages: List[BaseMessage]) -> str:
+        async with _llm_slots:
+            llm_stats.incr(key, "attempts")
+            record_attempt()
+            started = time.monotonic()
+            with stage(f"llm {key}"):
+                response = await llm.ainvoke(messages)
+            latency_tracker.record(key, time.monotonic() - started)
+        return response.content
@@ -1,7 +1,11 @@
-import textstat
-from typing import List
+import asyncio
+from typing import AsyncIterator, Callable, List, Optional, Tuple
 from .base_agent import BaseAgent
-from models.schemas import BlogArticle
+from .llm_resilience import llm_stats
+from .offload import run_cpu
+from .paragraph_cache import split_sections
+from analysis.readability import flesch_reading_ease
+from models.schemas import BlogArticle, SectionRevision
 
 class BlogWriterAgent(BaseAgent):
     def __init__(self):
@@ -9,13 +13,92 @@ class BlogWriterAgent(BaseAgent):
     
     async def execute(self, title: str, keywords: List[str], 
                      content_type: str = "blog_post", 
-                     target_length: int = 1500) -> BlogArticle:
+                     target_length: int = 1500,
+                     meta_description: Optional[str] = None) -> BlogArticle:
         
         content = await self._write_article(title, keywords, content_type, target_length)
-        meta_description = await self._generate_meta_description(title, content)
+        if meta_description is None:
+            meta_description = await self._generate_meta_description(title, content)
+        else:
+            llm_stats.incr(f"{self.agent_name}.meta_description", "avoided")
+        return await self._build_article(title, keywords, content, meta_description)
+    
+    async def execute_pipelined(self, title: str, keywords: List[str],
+                                content_type: str = "blog_post",
+                                target_length: int = 1500,
+                                on_section: Optional[Callable[[str], None]] = None,
+                                meta_description: Optional[str] = None) -> BlogArticle:
+        """Stream the article, handing each finished section to `on_section` as it completes.
+        
+        Unless one is passed in, the meta description is requested as soon as the
+        introduction is written instead of after the whole article.
+        """
+        if meta_description is not None:
+            llm_stats.incr(f"{self.agent_name}.meta_description", "avoided")
+        sections = []
+        meta_task = None
+        try:
+            async for section in self._stream_sections(title, keywords, content_type, target_length):
+                sections.append(section)
+                if meta_task is None and meta_description is None:
+                    meta_task = asyncio.ensure_future(self._generate_meta_description(title, section))
+                if on_section is not None:
+                    on_section(section)
+            content = "\n\n".join(sections)
+            if meta_description is None:
+                if meta_task is None:
+                    meta_task = asyncio.ensure_future(self._generate_meta_description(title, content))
+                meta_description = await meta_task
+        finally:
+            if meta_task is not None and not meta_task.done():
+                meta_task.cancel()
+        return await self._build_article(title, keywords, content, meta_description)
+    
+    async def revise(self, article: BlogArticle, revisions: List[SectionRevision]) -> BlogArticle:
+        """Rewrite only the sections named in `revisions`, concurrently; the rest is kept verbatim."""
+        sections = split_sections(article.content)
+        revised = await asyncio.gather(*[
+            self._revise_section(article, sections[revision.index], revision.instructions)
+            for revision in revisions
+        ])
+        for revision, section in zip(revisions, revised):
+            sections[revision.index] = section
+        # The title is unchanged, so the meta description still fits
+        return await self._build_article(
+            article.title, article.keywords, "\n\n".join(sections), article.meta_description
+        )
+    
+    async def _revise_section(self, article: BlogArticle, section: str, instructions: List[str]) -> str:
+        system_prompt = """You are an expert SEO editor revising one section of an article. 
+        Apply only the requested changes, keep the heading line and Markdown formatting 
+        unchanged, and return only the revised section."""
+        
+        changes = "\n".join(f"- {instruction}" for instruction in instructions)
+        user_prompt = f"""
+        Article Title: {article.title}
+        Target Keywords: {', '.join(article.keywords)}
+        
+        Requested Changes:
+        {changes}
+        
+        Section:
+        {section}
+        """
+        
+        revised = (await self._call_llm(system_prompt, user_prompt, task="revise_section")).strip()
+        if not revised:
+            return section
+        heading = section.split("\n", 1)[0]
+        if heading.startswith("#") and not revised.startswith("#"):
+            revised = f"{heading}\n\n{revised}"
+        return revised
+    
+    async def _build_article(self, title: str, keywords: List[str], content: str,
+                             meta_description: str) -> BlogArticle:
         word_count = len(content.split())
-        readability_score = textstat.flesch_reading_ease(content)
-        seo_score = await self._calculate_seo_score(content, keywords)
+        readability_score, seo_score = await run_cpu(
+            self._score_content, content, keywords, size=len(content)
+        )
         
         return BlogArticle(
             title=title,
@@ -29,7 +112,27 @@ class BlogWriterAgent(BaseAgent):
     
     async def _write_article(self, title: str, keywords: List[str], 
                            content_type: str, target_length: int) -> str:
-        
+        system_prompt, user_prompt = self._article_prompts(title, keywords, content_type, target_length)
+        return await self._call_llm(system_prompt, user_prompt, task="article")
+    
+    async def _stream_sections(self, title: str, keywords: List[str],
+                               content_type: str, target_length: int) -> AsyncIterator[str]:
+        # A section is complete once the next H2 heading starts (the introduction comes first)
+        system_prompt, user_prompt = self._article_prompts(title, keywords, content_type, target_length)
+        buffer = ""
+        async for delta in self._stream_llm(system_prompt, user_prompt, task="article"):
+            buffer += delta
+            boundary = buffer.find("\n## ", 1)
+            while boundary != -1:
+                section, buffer = buffer[:boundary].strip(), buffer[boundary + 1:]
+                if section:
+                    yield section
+                boundary = buffer.find("\n## ", 1)
+        if buffer.strip():
+            yield buffer.strip()
+    
+    def _article_prompts(self, title: str, keywords: List[str],
+                         content_type: str, target_length: int) -> Tuple[str, str]:
         system_prompt = f"""You are an expert SEO content writer. Write a {content_type} 
         that is informative, engaging, and optimized for search engines. 
         
@@ -55,7 +158,7 @@ class BlogWriterAgent(BaseAgent):
         4. Strong conclusion with call-to-action
         """
         
-        return await self._call_llm(system_prompt, user_prompt)
+        return system_prompt, user_prompt
     
     async def _generate_meta_description(self, title: str, content: str) -> str:
         system_prompt = """Write a compelling meta description (150-160 characters) 
@@ -65,9 +168,15 @@ class BlogWriterAgent(BaseAgent):
         content_preview = ' '.join(content.split()[:50])
         user_prompt = f"Title: {title}\nContent preview: {content_preview}\n\nWrite meta description:"
         
-        return await self._call_llm(system_prompt, user_prompt)
+        return await self._call_llm(system_prompt, user_prompt, task="meta_description")
+    
+    @staticmethod
+    def _score_content(content: str, keywords: List[str]) -> Tuple[float, float]:
+        # Pure CPU work, so it can run on the offload pool
+        return flesch_reading_ease(content), BlogWriterAgent._calculate_seo_score(content, keywords)
     
-    async def _calculate_seo_score(self, content: str, keywords: List[str]) -> float:
+    @staticmethod
+    def _calculate_seo_score(content: str, keywords: List[str]) -> float:
         # Simple SEO scoring based on keyword presence and density
         content_lower = content.lower()
         total_words = len(content.split())
@@ -0,0 +1,66 @@
+import heapq
+from collections import defaultdict, deque
+from datetime import date, timedelta
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+
+# A schedulable title and the keywords it targets (first one is its primary keyword)
+TitleIdea = Tuple[str, List[str]]
+
+
+class CalendarScheduler:
+    """Spreads a title/keyword pool over long calendars in O(n log n).
+
+    Titles are grouped by primary keyword and every publish slot takes the
+    group whose keyword was published least recently (a heap keyed by last
+    use), so articles targeting the same keyword end up as far apart as the
+    pool allows instead of cannibalizing each other in consecutive slots.
+    """
+
+    def __init__(self, posts_per_week: int = 7, publish_weekdays: Optional[Sequence[int]] = None):
+        self.posts_per_week = max(1, min(posts_per_week, 7))
+        # 0 = Monday ... 6 = Sunday
+        self.publish_weekdays = set(publish_weekdays) if publish_weekdays else set(range(7))
+
+    def publish_dates(self, start: date, days: int) -> List[date]:
+        dates = []
+        posts_per_week: Dict[Tuple[int, int], int] = defaultdict(int)
+        for offset in range(days):
+            day = start + timedelta(days=offset)
+            week = day.isocalendar()[:2]
+            if day.weekday() in self.publish_weekdays and posts_per_week[week] < self.posts_per_week:
+                posts_per_week[week] += 1
+                dates.append(day)
+        return dates
+
+    def schedule(self, dates: Sequence[date], titles: Sequence[TitleIdea],
+                 priority_keywords: Sequence[str] = ()) -> List[Tuple[date, str, List[str]]]:
+        """Assign one unused title to each date; dates beyond the pool are left out."""
+        groups: Dict[str, Deque[int]] = {}
+        ungrouped: Deque[int] = deque()
+        for index, (_, keywords) in enumerate(titles):
+            if keywords:
+                groups.setdefault(keywords[0].lower(), deque()).append(index)
+            else:
+                ungrouped.append(index)
+
+        # (slot last used, rank, keyword): unused groups first, priority keywords before others
+        ranks = {kw.lower(): rank for rank, kw in enumerate(priority_keywords)}
+        heap = [(-1, ranks.get(kw, len(ranks)), kw) for kw in groups]
+        heapq.heapify(heap)
+
+        entries = []
+        for slot, day in enumerate(dates):
+            index = None
+            while heap and index is None:
+                _, rank, keyword = heapq.heappop(heap)
+                if groups[keyword]:
+                    index = groups[keyword].popleft()
+                    heapq.heappush(heap, (slot, rank, keyword))
+            if index is None and ungrouped:
+                index = ungrouped.popleft()
+            if index is None:
+                break
+
+            title, keywords = titles[index]
+            entries.append((day, title, keywords))
+        return entries
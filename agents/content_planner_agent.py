@@ -1,15 +1,38 @@
-from datetime import datetime, timedelta
-from typing import List, Dict
+import asyncio
+import logging
+from datetime import datetime
+from typing import List, Dict, Optional
 from .base_agent import BaseAgent
-from models.schemas import SEOStrategy, ContentPlan
+from .calendar_scheduler import CalendarScheduler, TitleIdea
+from .llm_resilience import TRANSIENT_ERRORS
+from config.settings import settings
+from models.schemas import SEOStrategy, ContentPlan, TitleSuggestionBatch
+
+logger = logging.getLogger(__name__)
+
+# What a title batch can fail with once retries and JSON repairs are used up
+TITLE_BATCH_ERRORS = (ValueError, *TRANSIENT_ERRORS)
 
 class ContentPlannerAgent(BaseAgent):
     def __init__(self):
         super().__init__("ContentPlanner")
     
-    async def execute(self, seo_strategy: SEOStrategy, days: int = 7) -> ContentPlan:
-        content_schedule = await self._create_schedule(seo_strategy, days)
-        keyword_mapping = await self._map_keywords_to_content(seo_strategy)
+    async def execute(self, seo_strategy: SEOStrategy, days: int = 7,
+                      posts_per_week: int = 7,
+                      publish_weekdays: Optional[List[int]] = None) -> ContentPlan:
+        days = max(1, min(days, settings.MAX_CALENDAR_DAYS))
+        scheduler = CalendarScheduler(posts_per_week, publish_weekdays)
+        publish_dates = scheduler.publish_dates(datetime.now().date(), days)
+        
+        title_pool = self._build_title_pool(seo_strategy)
+        if len(title_pool) < len(publish_dates):
+            title_pool += await self._request_more_titles(
+                seo_strategy, title_pool, len(publish_dates) - len(title_pool)
+            )
+        
+        entries = scheduler.schedule(publish_dates, title_pool, seo_strategy.primary_keywords)
+        content_schedule = await self._create_schedule(entries)
+        keyword_mapping = await self._map_keywords_to_content(entries)
         content_types = await self._determine_content_types(seo_strategy)
         
         return ContentPlan(
@@ -19,17 +42,77 @@ class ContentPlannerAgent(BaseAgent):
             content_types=content_types
         )
     
-    async def _create_schedule(self, strategy: SEOStrategy, days: int) -> List[Dict[str, str]]:
+    def _build_title_pool(self, strategy: SEOStrategy) -> List[TitleIdea]:
+        all_keywords = strategy.primary_keywords + strategy.long_tail_keywords
+        pool = []
+        for i, title in enumerate(strategy.suggested_titles):
+            # Keywords the title actually targets, primary keywords first
+            keywords = [kw for kw in all_keywords if kw.lower() in title.lower()]
+            if not keywords and strategy.primary_keywords:
+                keywords = [strategy.primary_keywords[i % len(strategy.primary_keywords)]]
+            pool.append((title, keywords[:3]))
+        return pool
+    
+    async def _request_more_titles(self, strategy: SEOStrategy, pool: List[TitleIdea],
+                                   shortfall: int) -> List[TitleIdea]:
+        # Only called when the calendar outgrows the strategy's titles; batches run concurrently
+        batch_size = settings.CALENDAR_TITLE_BATCH_SIZE
+        all_keywords = strategy.primary_keywords + strategy.long_tail_keywords
+        batches = [min(batch_size, shortfall - start) for start in range(0, shortfall, batch_size)]
+        
+        results = await asyncio.gather(*[
+            self._suggest_title_batch(all_keywords, count, batch_number)
+            for batch_number, count in enumerate(batches)
+        ], return_exceptions=True)
+        
+        seen = {title.lower() for title, _ in pool}
+        new_titles = []
+        for batch_number, result in enumerate(results):
+            if isinstance(result, TITLE_BATCH_ERRORS):
+                # The calendar still gets the other batches' titles, just fewer of them
+                logger.warning("Title batch %d of %d failed: %s", batch_number + 1, len(batches), result)
+                continue
+            if isinstance(result, BaseException):
+                raise result
+            for suggestion in result.titles:
+                if suggestion.title.lower() in seen:
+                    continue
+                seen.add(suggestion.title.lower())
+                keywords = [kw.strip() for kw in suggestion.keywords if kw.strip()]
+                if not keywords and strategy.primary_keywords:
+                    keywords = [strategy.primary_keywords[len(new_titles) % len(strategy.primary_keywords)]]
+                new_titles.append((suggestion.title, keywords[:3]))
+        return new_titles[:shortfall]
+    
+    async def _suggest_title_batch(self, keywords: List[str], count: int,
+                                   batch_number: int) -> TitleSuggestionBatch:
+        # Rotate the keyword focus per batch so concurrent batches don't propose the same titles
+        offset = batch_number % max(len(keywords), 1)
+        focus_keywords = keywords[offset:] + keywords[:offset]
+        
+        system_prompt = """Create compelling, SEO-optimized article titles for a long-term 
+        content calendar. Each title must target one keyword naturally and cover a distinct 
+        angle (how-to, listicle, guide, comparison, tutorial, case study)."""
+        
+        user_prompt = f"""
+        Keywords, most important first: {', '.join(focus_keywords)}
+        
+        Generate {count} distinct article titles. For each, list the keywords it targets,
+        starting with its main keyword taken from the list above.
+        """
+        
+        return await self._call_llm_structured(
+            system_prompt, user_prompt, TitleSuggestionBatch, task="more_titles"
+        )
+    
+    async def _create_schedule(self, entries) -> List[Dict[str, str]]:
         schedule = []
-        start_date = datetime.now()
         
-        titles = strategy.suggested_titles
-        for i in range(min(days, len(titles))):
-            publish_date = start_date + timedelta(days=i)
+        for i, (publish_date, title, keywords) in enumerate(entries):
             schedule.append({
                 "date": publish_date.strftime("%Y-%m-%d"),
-                "title": titles[i],
-                "keywords": ", ".join(strategy.primary_keywords[:2]),
+                "title": title,
+                "keywords": ", ".join(keywords),
                 "content_type": self._assign_content_type(i),
                 "status": "planned"
             })
@@ -40,16 +123,8 @@ class ContentPlannerAgent(BaseAgent):
         types = ["how-to", "listicle", "guide", "comparison", "tutorial"]
         return types[index % len(types)]
     
-    async def _map_keywords_to_content(self, strategy: SEOStrategy) -> Dict[str, List[str]]:
-        mapping = {}
-        all_keywords = strategy.primary_keywords + strategy.long_tail_keywords
-        
-        for i, title in enumerate(strategy.suggested_titles):
-            # Assign 2-3 keywords per article
-            assigned_keywords = all_keywords[i*2:(i*2)+3]
-            mapping[title] = assigned_keywords
-        
-        return mapping
+    async def _map_keywords_to_content(self, entries) -> Dict[str, List[str]]:
+        return {title: keywords for _, title, keywords in entries}
     
     async def _determine_content_types(self, strategy: SEOStrategy) -> List[str]:
-        return ["blog_post", "how_to_guide", "listicle", "product_review", "comparison"]
\ No newline at end of file
+        return ["blog_post", "how_to_guide", "listicle", "product_review", "comparison"]
@@ -0,0 +1,126 @@
+import asyncio
+import random
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+import openai
+
+# Absolute monotonic time by which the current request must finish
+_deadline: ContextVar[Optional[float]] = ContextVar("llm_deadline", default=None)
+
+# Set only while background work meters its own LLM usage
+_call_meter: ContextVar[Optional["CallMeter"]] = ContextVar("llm_call_meter", default=None)
+
+TRANSIENT_ERRORS = (
+    asyncio.TimeoutError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request deadline leaves no time for another LLM call."""
+
+
+@contextmanager
+def request_deadline(seconds: Optional[float]):
+    """Bound every LLM call made inside the block to `seconds` from now."""
+    if seconds is None:
+        yield
+        return
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    # Nested deadlines can only tighten the outer one
+    token = _deadline.set(deadline if current is None else min(current, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time() -> Optional[float]:
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+class CallMeter:
+    """LLM attempts (including retries and hedges) made inside a `metered` block."""
+
+    def __init__(self):
+        self.attempts = 0
+
+
+@contextmanager
+def metered():
+    meter = CallMeter()
+    token = _call_meter.set(meter)
+    try:
+        yield meter
+    finally:
+        _call_meter.reset(token)
+
+
+def record_attempt():
+    meter = _call_meter.get()
+    if meter is not None:
+        meter.attempts += 1
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    # Exponential backoff with full jitter
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class LatencyTracker:
+    """Rolling latency window per agent/task, used to decide when to hedge."""
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._samples: Dict[str, deque] = defaultdict(lambda: deque(maxlen=window))
+
+    def record(self, key: str, seconds: float):
+        self._samples[key].append(seconds)
+
+    def percentile(self, key: str, pct: float, min_samples: int) -> Optional[float]:
+        samples = self._samples.get(key)
+        if not samples or len(samples) < min_samples:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(pct * len(ordered)))
+        return ordered[index]
+
+
+class LLMCallStats:
+    """Process-wide counters for LLM call cost and latency behaviour."""
+
+    FIELDS = (
+        "calls", "attempts", "retries", "timeouts", "failures",
+        "hedges_launched", "hedges_won", "deadline_exceeded", "cache_hits", "repairs",
+        "cancelled", "avoided",
+    )
+
+    def __init__(self):
+        self._counters: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {field: 0 for field in self.FIELDS}
+        )
+
+    def incr(self, key: str, field: str, amount: int = 1):
+        self._counters[key][field] += amount
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        totals = {field: 0 for field in self.FIELDS}
+        for counters in self._counters.values():
+            for field, value in counters.items():
+                totals[field] += value
+        return {"total": totals, **{key: dict(c) for key, c in self._counters.items()}}
+
+
+latency_tracker = LatencyTracker()
+llm_stats = LLMCallStats()
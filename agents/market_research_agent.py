@@ -1,73 +1,155 @@
-import requests
-import json
-from bs4 import BeautifulSoup
-from typing import List, Dict
+import random
+from typing import List, Dict, Optional, Tuple
 from .base_agent import BaseAgent
-from models.schemas import BusinessInput, MarketResearchResult
+from .offload import run_cpu
+from .semantic_cache import SemanticCache
+from config.settings import settings
+from analysis.trends import top_rising, trend_engine
+from models.schemas import (
+    BusinessInput, CompetitorPage, KeywordMetrics, KeywordTrend, MarketResearchDraft,
+    MarketResearchResult
+)
+from services.crawler import competitor_crawler
+from services.serp_client import serp_client
+
+# Prior research results, matched by similarity of the normalized business input
+research_cache = SemanticCache(
+    max_entries=settings.SEMANTIC_CACHE_SIZE,
+    reuse_threshold=settings.SEMANTIC_CACHE_REUSE_THRESHOLD,
+    seed_threshold=settings.SEMANTIC_CACHE_SEED_THRESHOLD
+)
 
 class MarketResearchAgent(BaseAgent):
     def __init__(self):
         super().__init__("MarketResearch")
     
     async def execute(self, business_input: BusinessInput) -> MarketResearchResult:
-        # Simulate market research (in production, use real APIs)
-        trending_keywords = await self._generate_trending_keywords(business_input)
-        competitor_insights = await self._analyze_competitors(business_input)
-        search_data = await self._get_search_volume_data(trending_keywords)
+        competitor_pages = await self._crawl_competitors(business_input)
+        rising = await self._rising_keywords(business_input)
+        draft = await self._research_with_cache(business_input, competitor_pages, rising)
+        
+        # Measured rising keywords lead; the LLM's suggestions fill in around them
+        trending_keywords = [trend.keyword for trend in rising]
+        seen = {kw.lower() for kw in trending_keywords}
+        trending_keywords += [kw for kw in draft.trending_keywords if kw.lower() not in seen]
+        search_data, difficulty_scores, keyword_metrics = await self._get_keyword_metrics(
+            trending_keywords, rising
+        )
+        
+        competitor_insights = [insight.model_dump() for insight in draft.competitor_insights]
+        competitor_insights += [
+            {"insight_type": "competitor_page", "description": self._describe_page(page)}
+            for page in competitor_pages
+        ]
         
         return MarketResearchResult(
             trending_keywords=trending_keywords,
             competitor_insights=competitor_insights,
             search_volume_data=search_data,
-            difficulty_scores={kw: 0.5 for kw in trending_keywords}
+            difficulty_scores=difficulty_scores,
+            keyword_metrics=keyword_metrics,
+            keyword_trends=rising
+        )
+    
+    async def _crawl_competitors(self, business_input: BusinessInput) -> List[CompetitorPage]:
+        urls = (business_input.competitor_urls or [])[:settings.MAX_COMPETITOR_URLS]
+        if not urls:
+            return []
+        return await competitor_crawler.crawl(urls, business_input.niche_keywords)
+    
+    def _describe_page(self, page: CompetitorPage) -> str:
+        keyword_usage = ", ".join(f"'{kw}' x{count}" for kw, count in page.keyword_counts.items())
+        headings = "; ".join(page.headings[:8])
+        return (
+            f"{page.url} - \"{page.title}\": {page.word_count} words; "
+            f"headings: {headings or 'none'}; keyword usage: {keyword_usage or 'none'}"
+        )
+    
+    async def _rising_keywords(self, business_input: BusinessInput) -> List[KeywordTrend]:
+        if not trend_engine.enabled:
+            return []
+        # The first query after new snapshots scores every keyword; keep it off the event loop
+        return await run_cpu(
+            top_rising, business_input.niche_keywords, settings.TREND_TOP_N,
+            size=trend_engine.unscored_keywords, min_size=settings.CPU_OFFLOAD_MIN_ROWS
+        )
+    
+    async def _research_with_cache(self, business_input: BusinessInput,
+                                   competitor_pages: List[CompetitorPage],
+                                   rising: List[KeywordTrend]) -> MarketResearchDraft:
+        cache_text = self._cache_text(business_input)
+        match = research_cache.lookup(cache_text)
+        
+        # Crawled pages make insights client-specific, so those results are only used as seeds
+        if match and match.similarity >= research_cache.reuse_threshold and not competitor_pages:
+            return match.value
+        
+        seed_keywords = match.value.trending_keywords if match else []
+        draft = await self._research_keywords_and_competitors(
+            business_input, competitor_pages, seed_keywords, rising
         )
+        research_cache.add(cache_text, draft)
+        return draft
+    
+    def _cache_text(self, business_input: BusinessInput) -> str:
+        return " | ".join([
+            business_input.business_type,
+            business_input.product_service,
+            business_input.target_audience,
+            ", ".join(sorted(kw.lower() for kw in business_input.niche_keywords))
+        ])
     
-    async def _generate_trending_keywords(self, business_input: BusinessInput) -> List[str]:
+    async def _research_keywords_and_competitors(self, business_input: BusinessInput,
+                                                 competitor_pages: List[CompetitorPage],
+                                                 seed_keywords: List[str],
+                                                 rising: List[KeywordTrend]) -> MarketResearchDraft:
+        # Trending keywords and competitor insights in a single round trip
         system_prompt = """You are a market research expert. Generate trending keywords 
-        related to the given business information. Focus on long-tail keywords with 
-        commercial intent."""
+        related to the given business information, focusing on long-tail keywords with 
+        commercial intent, and provide insights about what competitors are doing well. 
+        Base competitor insights on the crawled competitor pages when they are provided, 
+        and build on the measured rising keywords when they are provided."""
         
+        competitor_data = "\n".join(f"- {self._describe_page(page)}" for page in competitor_pages)
+        trend_data = ", ".join(f"{trend.keyword} ({trend.growth:+.0%})" for trend in rising)
         user_prompt = f"""
         Business Type: {business_input.business_type}
         Product/Service: {business_input.product_service}
         Target Audience: {business_input.target_audience}
         Niche Keywords: {', '.join(business_input.niche_keywords)}
+        Crawled Competitor Pages:
+        {competitor_data or 'none provided'}
+        Keywords Found For A Similar Business (reuse the relevant ones):
+        {', '.join(seed_keywords) or 'none'}
+        Measured Rising Keywords (recent search volume growth):
+        {trend_data or 'none'}
         
-        Generate 10 trending keywords that would be valuable for SEO content.
-        Return as a comma-separated list.
+        Provide:
+        - trending_keywords: 10 trending keywords that would be valuable for SEO content
+        - competitor_insights: 3 insights, one each of type "strategy" (what competitors do well),
+          "content_gap" (content opportunity) and "keyword_focus" (keyword strategy)
         """
         
-        result = await self._call_llm(system_prompt, user_prompt)
-        return [kw.strip() for kw in result.split(',')]
+        return await self._call_llm_structured(
+            system_prompt, user_prompt, MarketResearchDraft, task="research"
+        )
     
-    async def _analyze_competitors(self, business_input: BusinessInput) -> List[Dict[str, str]]:
-        # Simplified competitor analysis
-        system_prompt = """You are analyzing competitors for SEO strategy. 
-        Provide insights about what competitors might be doing well."""
-        
-        user_prompt = f"""
-        Business: {business_input.business_type} - {business_input.product_service}
+    async def _get_keyword_metrics(self, keywords: List[str], rising: Optional[List[KeywordTrend]] = None
+                                   ) -> Tuple[Dict[str, int], Dict[str, float], Dict[str, KeywordMetrics]]:
+        metrics = await serp_client.lookup(keywords) if serp_client.enabled else {}
+        trends = {trend.keyword: trend for trend in rising or []}
         
-        Provide 3 competitor insights in the format:
-        1. Strategy: [strategy description]
-        2. Content Gap: [content opportunity]
-        3. Keyword Focus: [keyword strategy]
-        """
-        
-        result = await self._call_llm(system_prompt, user_prompt)
-        
-        # Parse the result into structured format
-        lines = result.split('\n')
-        insights = []
-        for i, line in enumerate(lines[:3]):
-            insights.append({
-                "insight_type": ["strategy", "content_gap", "keyword_focus"][i],
-                "description": line.strip()
-            })
-        
-        return insights
-    
-    async def _get_search_volume_data(self, keywords: List[str]) -> Dict[str, int]:
-        # Simulate search volume data (in production, use real SEO APIs)
-        import random
-        return {kw: random.randint(100, 5000) for kw in keywords}
\ No newline at end of file
+        search_data, difficulty_scores = {}, {}
+        for kw in keywords:
+            if kw in metrics:
+                search_data[kw] = metrics[kw].search_volume
+                difficulty_scores[kw] = metrics[kw].competition
+            elif kw in trends:
+                # Weekly snapshot average scaled to the monthly volume SERP APIs report
+                search_data[kw] = round(trends[kw].moving_average * 52 / 12)
+                difficulty_scores[kw] = 0.5
+            else:
+                # Simulate search volume data when no SERP data is available
+                search_data[kw] = random.randint(100, 5000)
+                difficulty_scores[kw] = 0.5
+        return search_data, difficulty_scores, metrics
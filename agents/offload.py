@@ -0,0 +1,98 @@
+"""Keep CPU-bound stages off the event loop.
+
+`run_cpu` sends work above a size threshold to a shared thread or process
+pool (CPU_POOL) and runs small inputs inline, where a pool round trip would
+cost more than it saves. `LoopLagMonitor` measures how late the event loop
+wakes up from a short sleep; sustained lag means something is blocking it.
+"""
+import asyncio
+import functools
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+import numpy as np
+
+from config.settings import settings
+
+T = TypeVar("T")
+
+_executor: Optional[Executor] = None
+
+
+def _get_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        if settings.CPU_POOL == "process":
+            _executor = ProcessPoolExecutor(max_workers=settings.CPU_POOL_WORKERS)
+        else:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.CPU_POOL_WORKERS, thread_name_prefix="cpu"
+            )
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def run_cpu(func: Callable[..., T], *args: Any, size: int = 0,
+                  min_size: Optional[int] = None) -> T:
+    """Run `func(*args)` on the CPU pool when `size` reaches `min_size`, otherwise inline.
+
+    With a process pool, `func` and its arguments must be picklable
+    (module-level functions or static methods).
+    """
+    if min_size is None:
+        min_size = settings.CPU_OFFLOAD_MIN_CHARS
+    if settings.CPU_POOL == "inline" or size < min_size:
+        return func(*args)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(func, *args))
+
+
+class LoopLagMonitor:
+    """Samples event-loop scheduling delay: how late a short sleep wakes up."""
+
+    def __init__(self, interval: float = 0.1, window: int = 3000):
+        self.interval = interval
+        self._samples: deque = deque(maxlen=window)
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def reset(self):
+        self._samples.clear()
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self._samples.append(max(0.0, time.perf_counter() - started - self.interval))
+
+    def stats(self) -> Dict[str, float]:
+        if not self._samples:
+            return {"samples": 0}
+        lag = np.array(self._samples) * 1000
+        p50, p99 = np.percentile(lag, [50, 99])
+        return {
+            "samples": len(lag),
+            "p50_ms": round(float(p50), 2),
+            "p99_ms": round(float(p99), 2),
+            "max_ms": round(float(lag.max()), 2),
+        }
+
+
+loop_lag = LoopLagMonitor(interval=settings.LOOP_LAG_INTERVAL)
@@ -0,0 +1,93 @@
+import hashlib
+import re
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SECTION_BREAK = re.compile(r"\n(?=## )")
+
+
+def split_paragraphs(content: str) -> List[str]:
+    return [p.strip() for p in _PARAGRAPH_BREAK.split(content) if p.strip()]
+
+
+def split_sections(content: str) -> List[str]:
+    """The introduction followed by one entry per H2 section, headings included."""
+    return [s.strip() for s in _SECTION_BREAK.split(content) if s.strip()]
+
+
+def paragraph_hash(paragraph: str) -> str:
+    return hashlib.blake2b(paragraph.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English prose
+    return len(text) // 4 + 1
+
+
+def chunk_paragraphs(paragraphs: List[str], max_tokens: int) -> List[List[str]]:
+    """Group consecutive paragraphs into chunks of at most `max_tokens` (an oversized paragraph stands alone)."""
+    chunks: List[List[str]] = []
+    current: List[str] = []
+    used = 0
+    for paragraph in paragraphs:
+        tokens = estimate_tokens(paragraph)
+        if current and used + tokens > max_tokens:
+            chunks.append(current)
+            current, used = [], 0
+        current.append(paragraph)
+        used += tokens
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class ParagraphAnalysis:
+    """Cached review results for one paragraph; keyword counts are filled lazily."""
+
+    __slots__ = ("grammar_score", "plagiarism_risk", "issues", "word_count", "keyword_counts",
+                 "cacheable", "_text_lower")
+
+    def __init__(self, text: str, grammar_score: float, plagiarism_risk: str,
+                 issues: Sequence[str] = (), cacheable: bool = True):
+        self.grammar_score = grammar_score
+        self.plagiarism_risk = plagiarism_risk
+        self.issues = tuple(issues)
+        self.word_count = len(text.split())
+        self.keyword_counts: Dict[str, int] = {}
+        self.cacheable = cacheable  # False for placeholder scores, which must be reviewed again
+        self._text_lower = text.lower()
+
+    def keyword_count(self, keyword: str) -> int:
+        keyword = keyword.lower()
+        if keyword not in self.keyword_counts:
+            self.keyword_counts[keyword] = self._text_lower.count(keyword)
+        return self.keyword_counts[keyword]
+
+
+class ParagraphCache:
+    """LRU cache of paragraph analyses keyed by content hash."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, ParagraphAnalysis]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[ParagraphAnalysis]:
+        analysis = self._entries.get(key)
+        if analysis is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return analysis
+
+    def put(self, key: str, analysis: ParagraphAnalysis):
+        self._entries[key] = analysis
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
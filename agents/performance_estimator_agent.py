@@ -1,15 +1,29 @@
 from .base_agent import BaseAgent
-from models.schemas import BlogArticle, QualityReport, PerformanceEstimate
-from typing import List, Dict
+from .llm_resilience import llm_stats
+from analysis import performance
+from services.serp_client import competition_level, serp_client
+from models.schemas import BlogArticle, KeywordMetrics, QualityReport, PerformanceEstimate
+from typing import List, Dict, Optional
 
 class PerformanceEstimatorAgent(BaseAgent):
     def __init__(self):
         super().__init__("PerformanceEstimator")
     
-    async def execute(self, article: BlogArticle, quality_report: QualityReport) -> PerformanceEstimate:
+    async def execute(self, article: BlogArticle, quality_report: QualityReport,
+                      keyword_metrics: Optional[Dict[str, KeywordMetrics]] = None,
+                      known_competition: Optional[str] = None) -> PerformanceEstimate:
         ranking_estimate = await self._estimate_ranking(article, quality_report)
         traffic_potential = await self._estimate_traffic(article)
-        competition_level = await self._assess_competition(article.keywords)
+        if known_competition is not None:
+            # Assessed earlier for the same keywords (e.g. before a revision)
+            llm_stats.incr(f"{self.agent_name}.competition", "avoided")
+            competition_level = known_competition
+        elif keyword_metrics:
+            # Measured during research; no SERP lookup or LLM call needed
+            llm_stats.incr(f"{self.agent_name}.competition", "avoided")
+            competition_level = self._average_competition(keyword_metrics)
+        else:
+            competition_level = await self._assess_competition(article.keywords)
         success_probability = self._calculate_success_probability(
             article, quality_report, ranking_estimate
         )
@@ -22,43 +36,31 @@ class PerformanceEstimatorAgent(BaseAgent):
         )
     
     async def _estimate_ranking(self, article: BlogArticle, quality_report: QualityReport) -> int:
-        # Simplified ranking estimation based on content quality
-        base_score = (
-            article.seo_score * 0.4 +
-            quality_report.grammar_score * 0.2 +
-            quality_report.readability_score * 0.2 +
-            (100 - sum(quality_report.keyword_density.values())) * 0.2
-        )
-        
-        # Convert to ranking estimate (1-50)
-        if base_score >= 90:
-            return 1
-        elif base_score >= 80:
-            return 3
-        elif base_score >= 70:
-            return 7
-        elif base_score >= 60:
-            return 15
-        else:
-            return 25
+        # Simplified ranking estimation based on content quality (1-25)
+        return int(performance.estimate_ranking(
+            [article.seo_score],
+            [quality_report.grammar_score],
+            [quality_report.readability_score],
+            [sum(quality_report.keyword_density.values())]
+        )[0])
     
     async def _estimate_traffic(self, article: BlogArticle) -> int:
         # Simplified traffic estimation
-        base_traffic = article.word_count * 2  # Base calculation
-        
-        # Adjust for SEO score
-        multiplier = article.seo_score / 100
-        
-        return int(base_traffic * multiplier)
+        return int(performance.estimate_traffic([article.word_count], [article.seo_score])[0])
     
     async def _assess_competition(self, keywords: List[str]) -> str:
-        # Simplified competition assessment
+        if serp_client.enabled:
+            metrics = await serp_client.lookup(keywords)
+            if metrics:
+                return self._average_competition(metrics)
+        
+        # Simplified competition assessment when no SERP data is available
         system_prompt = """Assess the competition level for these keywords in SEO. 
-        Return: 'Low', 'Medium', or 'High'."""
+        Return only one word: 'Low', 'Medium', or 'High'."""
         
         user_prompt = f"Keywords: {', '.join(keywords)}"
         
-        result = await self._call_llm(system_prompt, user_prompt)
+        result = await self._call_llm(system_prompt, user_prompt, task="competition")
         
         levels = ['Low', 'Medium', 'High']
         for level in levels:
@@ -67,16 +69,15 @@ class PerformanceEstimatorAgent(BaseAgent):
         
         return 'Medium'
     
+    def _average_competition(self, metrics: Dict[str, KeywordMetrics]) -> str:
+        return competition_level(sum(m.competition for m in metrics.values()) / len(metrics))
+    
     def _calculate_success_probability(self, article: BlogArticle, 
                                      quality_report: QualityReport, 
                                      ranking: int) -> float:
-        # Calculate success probability based on various factors
-        quality_score = (
-            article.seo_score +
-            quality_report.grammar_score +
-            quality_report.readability_score
-        ) / 3
-        
-        ranking_factor = max(0, (51 - ranking) / 50)  # Higher rank = higher probability
-        
-        return min((quality_score / 100) * ranking_factor * 100, 95.0)
+        return float(performance.success_probability(
+            [article.seo_score],
+            [quality_report.grammar_score],
+            [quality_report.readability_score],
+            [ranking]
+        )[0])
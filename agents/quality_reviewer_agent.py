@@ -1,6 +1,26 @@
+import asyncio
+import math
 from .base_agent import BaseAgent
-from models.schemas import BlogArticle, QualityReport
-from typing import List, Dict, Optional, Any
+from .offload import run_cpu
+from .paragraph_cache import (
+    ParagraphAnalysis, ParagraphCache, chunk_paragraphs, estimate_tokens, paragraph_hash,
+    split_paragraphs, split_sections
+)
+from analysis.readability import score_batch
+from config.settings import settings
+from models.schemas import BlogArticle, ChunkReview, ParagraphReviewBatch, QualityReport, SectionRevision
+from typing import List, Dict, Optional, Any, Tuple
+
+RISK_LEVELS = ['Low', 'Medium', 'High']
+
+# Thresholds behind the report's suggestions
+MIN_READABILITY = 60
+MAX_KEYWORD_DENSITY = 3.0  # percent
+TARGET_KEYWORD_DENSITY = 2.0  # what revisions aim for when a keyword is overused
+MIN_WORD_COUNT = 1000
+
+# Shared across requests so re-evaluating an edited article only reviews changed paragraphs
+paragraph_cache = ParagraphCache(max_entries=settings.PARAGRAPH_CACHE_SIZE)
 
 
 class QualityReviewerAgent(BaseAgent):
@@ -8,77 +28,248 @@ class QualityReviewerAgent(BaseAgent):
         super().__init__("QualityReviewer")
     
     async def execute(self, article: BlogArticle) -> QualityReport:
-        grammar_score = await self._check_grammar(article.content)
+        chunks, chunk_keys = await run_cpu(
+            self._prepare_chunks, article.content, size=len(article.content)
+        )
+        chunk_analyses = await self._analyze_chunks(chunks, chunk_keys)
+        analyses = [analysis for chunk in chunk_analyses for analysis in chunk]
+        grammar_score = self._aggregate_grammar_score(analyses)
         readability_score = article.readability_score
-        keyword_density = self._calculate_keyword_density(article.content, article.keywords)
-        plagiarism_risk = await self._check_plagiarism_risk(article.content)
-        suggestions = await self._generate_suggestions(article)
+        keyword_density = self._calculate_keyword_density(analyses, article.keywords)
+        plagiarism_risk = self._aggregate_plagiarism_risk(analyses)
+        suggestions = await self._generate_suggestions(article, keyword_density)
         
         return QualityReport(
             grammar_score=grammar_score,
             readability_score=readability_score,
             keyword_density=keyword_density,
             plagiarism_risk=plagiarism_risk,
-            suggestions=suggestions
+            suggestions=suggestions,
+            chunk_reviews=self._review_chunks(chunk_analyses)
         )
     
-    async def _check_grammar(self, content: str) -> float:
-        # Simplified grammar check using LLM
-        system_prompt = """Analyze the text for grammar, spelling, and style issues. 
-        Rate the overall quality from 0-100."""
+    async def review_section(self, section: str, keywords: List[str]):
+        """Review one finished section ahead of `execute`, which then reads it from the paragraph cache."""
+        chunks, chunk_keys = self._prepare_chunks(section)
+        for analyses in await self._analyze_chunks(chunks, chunk_keys):
+            for analysis in analyses:
+                for keyword in keywords:
+                    analysis.keyword_count(keyword)
+    
+    @staticmethod
+    def _prepare_chunks(content: str) -> Tuple[List[List[str]], List[List[str]]]:
+        # Split, chunk and hash in one pass that can run on the offload pool
+        chunks = chunk_paragraphs(split_paragraphs(content), settings.REVIEW_CHUNK_TOKENS)
+        return chunks, [[paragraph_hash(paragraph) for paragraph in chunk] for chunk in chunks]
+    
+    async def _analyze_chunks(self, chunks: List[List[str]],
+                              chunk_keys: List[List[str]]) -> List[List[ParagraphAnalysis]]:
+        analyses = {key: paragraph_cache.get(key) for keys in chunk_keys for key in set(keys)}
+        
+        # Map: unseen paragraphs are reviewed chunk by chunk, the calls running concurrently
+        pending: List[Dict[str, str]] = []
+        queued = set()
+        for chunk, keys in zip(chunks, chunk_keys):
+            changed = {}
+            for key, paragraph in zip(keys, chunk):
+                if analyses[key] is None and key not in queued:
+                    queued.add(key)
+                    changed[key] = paragraph
+            if changed:
+                pending.append(changed)
+        pending = self._merge_batches(pending)
         
-        user_prompt = f"Analyze this content for grammar quality:\n\n{content[:1000]}..."
+        reviewed = await asyncio.gather(*[
+            self._review_paragraphs(list(changed.values())) for changed in pending
+        ])
+        for changed, chunk_reviews in zip(pending, reviewed):
+            for key, analysis in zip(changed, chunk_reviews):
+                if analysis.cacheable:
+                    paragraph_cache.put(key, analysis)
+                analyses[key] = analysis
         
-        result = await self._call_llm(system_prompt, user_prompt)
+        return [[analyses[key] for key in keys] for keys in chunk_keys]
+    
+    @staticmethod
+    def _merge_batches(pending: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        # Every call adds a time-to-first-token wait and the slowest sets the latency, so
+        # scattered edits share calls up to the chunk budget, and long articles get at most
+        # REVIEW_MAX_CALLS calls
+        merged: List[Dict[str, str]] = []
+        used: List[int] = []
+        for changed in pending:
+            tokens = sum(estimate_tokens(paragraph) for paragraph in changed.values())
+            if merged and used[-1] + tokens <= settings.REVIEW_CHUNK_TOKENS:
+                merged[-1].update(changed)
+                used[-1] += tokens
+            else:
+                merged.append(dict(changed))
+                used.append(tokens)
+        per_call = math.ceil(len(merged) / settings.REVIEW_MAX_CALLS)
+        if per_call > 1:
+            merged = [
+                {key: paragraph for changed in merged[start:start + per_call] for key, paragraph in changed.items()}
+                for start in range(0, len(merged), per_call)
+            ]
+        return merged
+    
+    async def _review_paragraphs(self, paragraphs: List[str]) -> List[ParagraphAnalysis]:
+        system_prompt = """Review each numbered paragraph independently. Rate its grammar, 
+        spelling, and style quality from 0-100, assess whether it appears original or 
+        potentially plagiarized ('Low', 'Medium' or 'High' risk), and list its specific 
+        grammar, spelling or style problems (an empty list if there are none)."""
+        
+        user_prompt = "\n\n".join(f"[{i}] {paragraph}" for i, paragraph in enumerate(paragraphs, start=1))
         
-        # Extract score from response (simplified)
         try:
-            score = float([word for word in result.split() if word.replace('.', '').isdigit()][-1])
-            return min(max(score, 0), 100)
-        except:
-            return 85.0  # Default score
+            batch = await self._call_llm_structured(
+                system_prompt, user_prompt, ParagraphReviewBatch, task="paragraph_review"
+            )
+            reviews = {review.index: review for review in batch.reviews}
+        except ValueError:
+            reviews = {}
+        
+        analyses = []
+        for i, paragraph in enumerate(paragraphs, start=1):
+            review = reviews.get(i)
+            if review is None:
+                # Default scores, kept out of the cache so the next review retries
+                analyses.append(ParagraphAnalysis(paragraph, 85.0, 'Low', cacheable=False))
+            else:
+                analyses.append(ParagraphAnalysis(
+                    paragraph, review.grammar_score, review.plagiarism_risk, review.issues
+                ))
+        return analyses
+    
+    def _review_chunks(self, chunk_analyses: List[List[ParagraphAnalysis]]) -> List[ChunkReview]:
+        # Reduce: each chunk is scored like a small article
+        return [
+            ChunkReview(
+                index=index,
+                word_count=sum(a.word_count for a in analyses),
+                grammar_score=self._aggregate_grammar_score(analyses),
+                plagiarism_risk=self._aggregate_plagiarism_risk(analyses),
+                issues=[issue for a in analyses for issue in a.issues]
+            )
+            for index, analyses in enumerate(chunk_analyses, start=1)
+        ]
+    
+    def _aggregate_grammar_score(self, analyses: List[ParagraphAnalysis]) -> float:
+        # Length-weighted so short headings don't dominate the score
+        total_words = sum(a.word_count for a in analyses)
+        if total_words == 0:
+            return 85.0
+        return sum(a.grammar_score * a.word_count for a in analyses) / total_words
+    
+    def _aggregate_plagiarism_risk(self, analyses: List[ParagraphAnalysis]) -> str:
+        total_words = sum(a.word_count for a in analyses)
+        if total_words == 0:
+            return 'Low'
+        weighted_level = sum(
+            RISK_LEVELS.index(a.plagiarism_risk) * a.word_count for a in analyses
+        ) / total_words
+        return RISK_LEVELS[round(weighted_level)]
     
-    def _calculate_keyword_density(self, content: str, keywords: List[str]) -> Dict[str, float]:
-        content_lower = content.lower()
-        total_words = len(content.split())
+    def _calculate_keyword_density(self, analyses: List[ParagraphAnalysis], keywords: List[str]) -> Dict[str, float]:
+        total_words = max(sum(a.word_count for a in analyses), 1)
         
         density = {}
         for keyword in keywords:
-            count = content_lower.count(keyword.lower())
+            count = sum(a.keyword_count(keyword) for a in analyses)
             density[keyword] = (count / total_words) * 100
         
         return density
     
-    async def _check_plagiarism_risk(self, content: str) -> str:
-        # Simplified plagiarism check
-        system_prompt = """Assess if this content appears to be original or potentially 
-        plagiarized. Return: 'Low', 'Medium', or 'High' risk."""
+    async def _generate_suggestions(self, article: BlogArticle, keyword_density: Dict[str, float]) -> List[str]:
+        suggestions = []
         
-        user_prompt = f"Assess plagiarism risk for:\n\n{content[:500]}..."
+        # Check readability
+        if article.readability_score < MIN_READABILITY:
+            suggestions.append(self._readability_suggestion())
         
-        result = await self._call_llm(system_prompt, user_prompt)
+        # Check keyword density
+        for keyword, density in keyword_density.items():
+            if density > MAX_KEYWORD_DENSITY:
+                suggestions.append(self._density_suggestion(keyword, density))
         
-        risk_levels = ['Low', 'Medium', 'High']
-        for level in risk_levels:
-            if level.lower() in result.lower():
-                return level
+        # Check length
+        if article.word_count < MIN_WORD_COUNT:
+            suggestions.append(self._length_suggestion())
         
-        return 'Low'
+        return suggestions
     
-    async def _generate_suggestions(self, article: BlogArticle) -> List[str]:
-        suggestions = []
+    @staticmethod
+    def _readability_suggestion() -> str:
+        return "Consider simplifying sentences for better readability"
+    
+    @staticmethod
+    def _density_suggestion(keyword: str, density: float) -> str:
+        return f"Reduce keyword density for '{keyword}' - currently {density:.1f}%"
+    
+    @staticmethod
+    def _length_suggestion() -> str:
+        return "Consider expanding content for better SEO performance"
+    
+    async def plan_revisions(self, article: BlogArticle, quality_report: QualityReport) -> List[SectionRevision]:
+        """Map each of the report's suggestions to the sections responsible for it."""
+        return await run_cpu(
+            self._plan_revisions, article, quality_report.keyword_density, size=len(article.content)
+        )
+    
+    @staticmethod
+    def _plan_revisions(article: BlogArticle, keyword_density: Dict[str, float]) -> List[SectionRevision]:
+        sections = split_sections(article.content)
+        words = [len(section.split()) for section in sections]
+        revisions: Dict[int, SectionRevision] = {}
         
-        # Check readability
-        if article.readability_score < 60:
-            suggestions.append("Consider simplifying sentences for better readability")
+        def assign(index: int, suggestion: str, instruction: str):
+            if index not in revisions:
+                heading = sections[index].split("\n", 1)[0] if sections[index].startswith("#") else ""
+                revisions[index] = SectionRevision(index=index, heading=heading, suggestions=[], instructions=[])
+            if suggestion not in revisions[index].suggestions:
+                revisions[index].suggestions.append(suggestion)
+            revisions[index].instructions.append(instruction)
         
-        # Check keyword density
-        for keyword, density in self._calculate_keyword_density(article.content, article.keywords).items():
-            if density > 3:
-                suggestions.append(f"Reduce keyword density for '{keyword}' - currently {density:.1f}%")
+        # Overused keywords: trim the densest sections first, keeping one mention in each
+        for keyword, density in keyword_density.items():
+            if density <= MAX_KEYWORD_DENSITY:
+                continue
+            suggestion = QualityReviewerAgent._density_suggestion(keyword, density)
+            counts = [section.lower().count(keyword.lower()) for section in sections]
+            excess = sum(counts) - int(article.word_count * TARGET_KEYWORD_DENSITY / 100)
+            densest = sorted(range(len(sections)), key=lambda i: counts[i] / max(words[i], 1), reverse=True)
+            trimmed = 0
+            for index in densest:
+                if excess <= 0 or trimmed >= settings.REVISE_MAX_SECTIONS:
+                    break
+                # A short section with a single mention can be the densest; it has nothing to cut
+                if counts[index] <= 1:
+                    continue
+                cut = min(excess, counts[index] - 1)
+                assign(index, suggestion,
+                       f"Use '{keyword}' at most {counts[index] - cut} times; reword the other mentions")
+                excess -= cut
+                trimmed += 1
         
-        # Check length
-        if article.word_count < 1000:
-            suggestions.append("Consider expanding content for better SEO performance")
+        # Hard reading: simplify the sections that score below the threshold, hardest first
+        if article.readability_score < MIN_READABILITY:
+            scores = score_batch(sections)["flesch_reading_ease"]
+            hardest = [i for i in scores.argsort() if scores[i] < MIN_READABILITY]
+            # Every section can clear the threshold while the whole article doesn't; then
+            # the hardest section is still the best place to start
+            hardest = hardest or list(scores.argsort()[:1])
+            for index in hardest[:settings.REVISE_MAX_SECTIONS]:
+                assign(int(index), QualityReviewerAgent._readability_suggestion(),
+                       "Shorten long sentences and prefer simpler words, keeping every fact and keyword")
+        
+        # Too short: spread the missing words over the shortest body sections
+        if article.word_count < MIN_WORD_COUNT:
+            body = list(range(1, len(sections))) or [0]
+            shortest = sorted(body, key=lambda i: words[i])[:settings.REVISE_MAX_SECTIONS]
+            # Aim a little past the threshold so the revised article clears it
+            missing = int(MIN_WORD_COUNT * 1.1) - article.word_count
+            for index in shortest:
+                assign(index, QualityReviewerAgent._length_suggestion(),
+                       f"Expand by about {math.ceil(missing / len(shortest))} words with concrete examples or tips")
         
-        return suggestions
\ No newline at end of file
+        return [revisions[index] for index in sorted(revisions)]
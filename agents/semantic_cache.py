@@ -0,0 +1,95 @@
+import re
+import zlib
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+_NON_WORD = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    return _SPACES.sub(" ", _NON_WORD.sub(" ", text.lower())).strip()
+
+
+class HashedNgramVectorizer:
+    """Dependency-free text embedding: hashed word and character n-gram counts."""
+
+    def __init__(self, dimensions: int = 4096, char_ngrams: tuple = (3, 4, 5)):
+        self.dimensions = dimensions
+        self.char_ngrams = char_ngrams
+
+    def _features(self, text: str) -> List[str]:
+        words = text.split()
+        features = [f"w:{word}" for word in words]
+        features += [f"b:{a} {b}" for a, b in zip(words, words[1:])]
+        padded = f" {text} "
+        for n in self.char_ngrams:
+            features += [f"c:{padded[i:i + n]}" for i in range(len(padded) - n + 1)]
+        return features
+
+    def embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for feature in self._features(normalize_text(text)):
+            # crc32 is stable across processes, unlike hash()
+            vector[zlib.crc32(feature.encode("utf-8")) % self.dimensions] += 1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class SemanticMatch(NamedTuple):
+    similarity: float
+    value: Any
+
+
+class SemanticCache:
+    """In-memory vector index mapping similar inputs to prior results.
+
+    Embeddings live in one preallocated matrix so a lookup is a single
+    matrix-vector product; once full, the oldest entries are overwritten.
+    """
+
+    def __init__(self, max_entries: int, reuse_threshold: float, seed_threshold: float,
+                 vectorizer: Optional[HashedNgramVectorizer] = None):
+        self.vectorizer = vectorizer or HashedNgramVectorizer()
+        self.max_entries = max_entries
+        self.reuse_threshold = reuse_threshold
+        self.seed_threshold = seed_threshold
+        self._vectors = np.zeros((max_entries, self.vectorizer.dimensions), dtype=np.float32)
+        self._values: List[Any] = [None] * max_entries
+        self._size = 0
+        self._next = 0
+        self.stats = {"lookups": 0, "reused": 0, "seeded": 0, "misses": 0}
+
+    def lookup(self, text: str) -> Optional[SemanticMatch]:
+        """Closest prior result at or above the seed threshold, counted as reuse/seed/miss."""
+        self.stats["lookups"] += 1
+        match = self._nearest(self.vectorizer.embed(text))
+        if match is None or match.similarity < self.seed_threshold:
+            self.stats["misses"] += 1
+            return None
+        self.stats["reused" if match.similarity >= self.reuse_threshold else "seeded"] += 1
+        return match
+
+    def add(self, text: str, value: Any):
+        self._vectors[self._next] = self.vectorizer.embed(text)
+        self._values[self._next] = value
+        self._next = (self._next + 1) % self.max_entries
+        self._size = min(self._size + 1, self.max_entries)
+
+    def metrics(self) -> Dict[str, float]:
+        lookups = self.stats["lookups"]
+        return {
+            **self.stats,
+            "entries": self._size,
+            "reuse_rate": self.stats["reused"] / lookups if lookups else 0.0,
+            "hit_rate": (self.stats["reused"] + self.stats["seeded"]) / lookups if lookups else 0.0,
+        }
+
+    def _nearest(self, vector: np.ndarray) -> Optional[SemanticMatch]:
+        if self._size == 0:
+            return None
+        # Rows are unit vectors, so the dot product is cosine similarity
+        similarities = self._vectors[:self._size] @ vector
+        best = int(np.argmax(similarities))
+        return SemanticMatch(float(similarities[best]), self._values[best])
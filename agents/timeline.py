@@ -0,0 +1,35 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+# Set only while a request is being profiled; stages are no-ops otherwise
+_timeline: ContextVar[Optional["StageTimeline"]] = ContextVar("stage_timeline", default=None)
+
+
+class StageTimeline:
+    """Wall-clock spans of the async stages (agent steps, LLM calls) of one request."""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.spans: List[Tuple[str, float, float]] = []
+
+    def activate(self):
+        return _timeline.set(self)
+
+    @staticmethod
+    def deactivate(token):
+        _timeline.reset(token)
+
+
+@contextmanager
+def stage(name: str):
+    timeline = _timeline.get()
+    if timeline is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timeline.spans.append((name, started - timeline.origin, time.perf_counter() - timeline.origin))
@@ -0,0 +1,59 @@
+"""Vectorized ranking, traffic and success-probability estimates.
+
+Same arithmetic as PerformanceEstimatorAgent, evaluated over columnar
+arrays so whole portfolios of articles are scored in one NumPy pass.
+"""
+from typing import Dict, Sequence, Union
+
+import numpy as np
+
+ArrayLike = Union[Sequence[float], np.ndarray]
+
+# (minimum base score, estimated ranking), best first
+RANKING_BANDS = ((90, 1), (80, 3), (70, 7), (60, 15))
+DEFAULT_RANKING = 25
+
+
+def estimate_ranking(seo_score: ArrayLike, grammar_score: ArrayLike,
+                     readability_score: ArrayLike, keyword_density_sum: ArrayLike) -> np.ndarray:
+    base_score = (
+        np.asarray(seo_score, dtype=np.float64) * 0.4 +
+        np.asarray(grammar_score, dtype=np.float64) * 0.2 +
+        np.asarray(readability_score, dtype=np.float64) * 0.2 +
+        (100 - np.asarray(keyword_density_sum, dtype=np.float64)) * 0.2
+    )
+    return np.select(
+        [base_score >= threshold for threshold, _ in RANKING_BANDS],
+        [ranking for _, ranking in RANKING_BANDS],
+        default=DEFAULT_RANKING
+    ).astype(np.int64)
+
+
+def estimate_traffic(word_count: ArrayLike, seo_score: ArrayLike) -> np.ndarray:
+    base_traffic = np.asarray(word_count, dtype=np.float64) * 2
+    multiplier = np.asarray(seo_score, dtype=np.float64) / 100
+    return np.trunc(base_traffic * multiplier).astype(np.int64)
+
+
+def success_probability(seo_score: ArrayLike, grammar_score: ArrayLike,
+                        readability_score: ArrayLike, ranking: ArrayLike) -> np.ndarray:
+    quality_score = (
+        np.asarray(seo_score, dtype=np.float64) +
+        np.asarray(grammar_score, dtype=np.float64) +
+        np.asarray(readability_score, dtype=np.float64)
+    ) / 3
+    ranking_factor = np.maximum(0, (51 - np.asarray(ranking, dtype=np.float64)) / 50)
+    return np.minimum((quality_score / 100) * ranking_factor * 100, 95.0)
+
+
+def score_articles(seo_score: ArrayLike, grammar_score: ArrayLike, readability_score: ArrayLike,
+                   keyword_density_sum: ArrayLike, word_count: ArrayLike) -> Dict[str, np.ndarray]:
+    """Score many articles at once; every argument is one column of equal length."""
+    ranking = estimate_ranking(seo_score, grammar_score, readability_score, keyword_density_sum)
+    return {
+        "estimated_ranking": ranking,
+        "traffic_potential": estimate_traffic(word_count, seo_score),
+        "success_probability": success_probability(
+            seo_score, grammar_score, readability_score, ranking
+        ),
+    }
@@ -0,0 +1,416 @@
+"""Keyword trend detection over weekly search-volume snapshots.
+
+Snapshots are stored column-per-keyword in one float32 matrix of shape
+(weeks, keywords), memory-mapped from disk, so a new week is a single
+appended row and a scoring pass reads only the trailing weeks it needs.
+Keyword ids are line numbers in keywords.txt. Growth, moving averages and
+seasonality are computed for every keyword in vectorized blocks, and niche
+queries go through a token index, so ranking a niche's rising keywords is
+an index lookup plus an argpartition.
+
+Usage:
+    python -m analysis.trends ingest 2026-01-05 snapshot.csv   # keyword,volume rows
+    python -m analysis.trends top "crm software" "sales pipeline" -n 20
+"""
+import argparse
+import csv
+import json
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from config.settings import settings
+from models.schemas import KeywordTrend
+
+WEEKS_PER_YEAR = 52
+MIN_CAPACITY = 1024  # keyword columns reserved by a new store
+BLOCK_SIZE = 1 << 16  # keywords per vectorized pass (~27 MB of float32 history)
+
+
+class TrendScores(NamedTuple):
+    volume: np.ndarray          # latest week
+    moving_average: np.ndarray  # short window mean
+    growth: np.ndarray          # short window vs the window before it
+    momentum: np.ndarray        # short vs long moving average
+    seasonality: np.ndarray     # year-over-year correlation, 0 without two years of history
+    score: np.ndarray           # growth beyond what the seasonal pattern explains
+
+
+class TokenIndex(NamedTuple):
+    """Keyword ids per token, CSR-style: postings[offsets[t]:offsets[t + 1]] for token id t."""
+    vocabulary: Dict[str, int]
+    offsets: np.ndarray
+    postings: np.ndarray
+
+    def lookup(self, token: str) -> np.ndarray:
+        token_id = self.vocabulary.get(token)
+        if token_id is None:
+            return np.zeros(0, dtype=np.int64)
+        return self.postings[self.offsets[token_id]:self.offsets[token_id + 1]]
+
+
+class TrendStore:
+    """Memory-mapped (weeks, keywords) float32 volume matrix plus keyword ids.
+
+    Rows are `capacity` columns wide, with unused columns reserved for future
+    keywords. Capacity doubles when it runs out, so the matrix is rewritten only
+    O(log keywords) times over the life of the store. Each rewrite goes to a new
+    file for the next generation, and layout.json (capacity plus generation) is
+    swapped in afterwards, so a reader always pairs a matrix file with the row
+    width it was written with.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self._keywords: Optional[List[str]] = None
+        self._ids: Optional[Dict[str, int]] = None
+        self._weeks: Optional[List[str]] = None
+        self._capacity: Optional[int] = None
+        self._generation: Optional[int] = None
+        self._loaded_stamp: Optional[Tuple[Optional[float], int]] = None
+
+    def refresh(self):
+        """Drop cached metadata if another process (e.g. the ingest CLI) added weeks or widened the matrix."""
+        path = self.directory / "weeks.json"
+        stamp = (path.stat().st_mtime if path.exists() else None, self._read_layout().get("generation", 0))
+        if stamp != self._loaded_stamp:
+            self._forget()
+            self._loaded_stamp = stamp
+
+    def _forget(self):
+        self._keywords = self._ids = self._weeks = self._capacity = self._generation = None
+
+    def _read_layout(self) -> Dict[str, int]:
+        path = self.directory / "layout.json"
+        return json.loads(path.read_text()) if path.exists() else {}
+
+    def _load_layout(self):
+        layout = self._read_layout()
+        # Stores written before capacity was reserved are exactly as wide as their keywords
+        self._capacity = layout.get("capacity", len(self.keywords))
+        self._generation = layout.get("generation", 0)
+
+    @property
+    def generation(self) -> int:
+        if self._generation is None:
+            self._load_layout()
+        return self._generation
+
+    def _generation_path(self, generation: int) -> Path:
+        return self.directory / ("volumes.f32" if generation == 0 else f"volumes.{generation}.f32")
+
+    @property
+    def _matrix_path(self) -> Path:
+        return self._generation_path(self.generation)
+
+    @property
+    def keywords(self) -> List[str]:
+        if self._keywords is None:
+            path = self.directory / "keywords.txt"
+            self._keywords = path.read_text().splitlines() if path.exists() else []
+        return self._keywords
+
+    @property
+    def ids(self) -> Dict[str, int]:
+        if self._ids is None:
+            self._ids = {keyword: index for index, keyword in enumerate(self.keywords)}
+        return self._ids
+
+    @property
+    def weeks(self) -> List[str]:
+        if self._weeks is None:
+            path = self.directory / "weeks.json"
+            self._weeks = json.loads(path.read_text()) if path.exists() else []
+        return self._weeks
+
+    @property
+    def capacity(self) -> int:
+        if self._capacity is None:
+            self._load_layout()
+        return self._capacity
+
+    @property
+    def version(self) -> Tuple[int, int]:
+        return len(self.weeks), len(self.keywords)
+
+    def matrix(self) -> np.ndarray:
+        for attempt in range(2):
+            weeks, keywords = self.version
+            if weeks == 0 or keywords == 0:
+                return np.zeros((0, 0), dtype=np.float32)
+            # A widen by another process since this reader cached its layout shows up as
+            # more keywords than columns, or as the old generation's file being gone
+            if keywords <= self.capacity:
+                try:
+                    matrix = np.memmap(self._matrix_path, dtype=np.float32, mode="r",
+                                       shape=(weeks, self.capacity))
+                    return matrix[:, :keywords]
+                except FileNotFoundError:
+                    if attempt:
+                        raise
+            self._forget()
+        raise ValueError(f"Trend store {self.directory} has more keywords than matrix columns")
+
+    def append_week(self, week: date, volumes: Dict[str, float]):
+        """Add one weekly snapshot; keywords missing from it get volume 0."""
+        if self.weeks and week.isoformat() <= self.weeks[-1]:
+            raise ValueError(f"Week {week} is not after the latest stored week {self.weeks[-1]}")
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        new_keywords = sorted({kw.strip().lower() for kw in volumes} - set(self.ids))
+        if new_keywords:
+            self._widen(len(self.keywords) + len(new_keywords))
+            with (self.directory / "keywords.txt").open("a") as f:
+                f.writelines(f"{keyword}\n" for keyword in new_keywords)
+            self._keywords = self.keywords + new_keywords
+            self._ids = None
+
+        row = np.zeros(self.capacity, dtype=np.float32)
+        for keyword, volume in volumes.items():
+            row[self.ids[keyword.strip().lower()]] = volume
+        with self._matrix_path.open("ab") as f:
+            f.write(row.tobytes())
+        self._weeks = self.weeks + [week.isoformat()]
+        self._write_json("weeks.json", self._weeks)
+
+    def token_index(self) -> TokenIndex:
+        """Token -> keyword ids, persisted next to the matrix and rebuilt when keywords change."""
+        meta_path = self.directory / "token_index.json"
+        if meta_path.exists() and json.loads(meta_path.read_text())["keywords"] == len(self.keywords):
+            tokens = (self.directory / "tokens.txt").read_text().splitlines()
+            return TokenIndex(
+                vocabulary={token: token_id for token_id, token in enumerate(tokens)},
+                offsets=np.load(self.directory / "token_offsets.npy", mmap_mode="r"),
+                postings=np.load(self.directory / "token_postings.npy", mmap_mode="r")
+            )
+
+        vocabulary: Dict[str, int] = {}
+        token_ids: List[int] = []
+        counts: List[int] = []
+        for keyword in self.keywords:
+            tokens = set(keyword.split())
+            counts.append(len(tokens))
+            token_ids.extend(vocabulary.setdefault(token, len(vocabulary)) for token in tokens)
+        token_array = np.array(token_ids, dtype=np.int64)
+        keyword_ids = np.repeat(np.arange(len(self.keywords), dtype=np.int64), counts)
+        # Stable sort keeps each token's postings in ascending keyword id order
+        postings = keyword_ids[np.argsort(token_array, kind="stable")]
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(token_array, minlength=len(vocabulary)))])
+
+        if self.keywords:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            (self.directory / "tokens.txt").write_text("".join(f"{token}\n" for token in vocabulary))
+            np.save(self.directory / "token_offsets.npy", offsets)
+            np.save(self.directory / "token_postings.npy", postings)
+            meta_path.write_text(json.dumps({"keywords": len(self.keywords)}))
+        return TokenIndex(vocabulary, offsets, postings)
+
+    def _write_json(self, name: str, value):
+        # Readers in other processes must never see a half-written file
+        tmp_path = self.directory / f"{name}.tmp"
+        tmp_path.write_text(json.dumps(value))
+        tmp_path.replace(self.directory / name)
+
+    def _widen(self, width: int):
+        """Make room for `width` keyword columns, growing the capacity geometrically."""
+        old_capacity = self.capacity
+        if width <= old_capacity and (self.directory / "layout.json").exists():
+            return
+        capacity = max(width, 2 * old_capacity, MIN_CAPACITY)
+        old_path, generation = self._matrix_path, self.generation
+        weeks = len(self.weeks)
+        if weeks:
+            # Rewrite row by row into the next generation's file, padding history with
+            # zeros for the new columns; readers keep using the old file until the swap
+            generation += 1
+            old = np.memmap(old_path, dtype=np.float32, mode="r", shape=(weeks, old_capacity))
+            new_path = self._generation_path(generation)
+            tmp_path = new_path.with_suffix(".tmp")
+            padding = np.zeros(capacity - old_capacity, dtype=np.float32)
+            with tmp_path.open("wb") as f:
+                for row in old:
+                    f.write(np.asarray(row).tobytes())
+                    f.write(padding.tobytes())
+            del old
+            tmp_path.replace(new_path)
+        self._write_json("layout.json", {"capacity": capacity, "generation": generation})
+        self._capacity, self._generation = capacity, generation
+        if weeks:
+            # Readers that still have it mapped keep their view; new reads follow the layout
+            old_path.unlink()
+
+
+def score_block(volumes: np.ndarray, short_window: int, long_window: int) -> TrendScores:
+    """Trend metrics for a (weeks, keywords) block of volumes, newest week last."""
+    volumes = np.asarray(volumes, dtype=np.float32)
+    weeks = volumes.shape[0]
+    short_ma = volumes[-short_window:].mean(axis=0)
+    previous = volumes[-2 * short_window:-short_window].mean(axis=0)
+    long_ma = volumes[-long_window:].mean(axis=0)
+    # +1 keeps brand-new keywords (zero history) finite
+    growth = (short_ma - previous) / (previous + 1)
+    momentum = short_ma / (long_ma + 1) - 1
+
+    seasonality = np.zeros_like(short_ma)
+    expected_growth = np.zeros_like(short_ma)
+    if weeks >= 2 * WEEKS_PER_YEAR:
+        this_year = volumes[-WEEKS_PER_YEAR:]
+        last_year = volumes[-2 * WEEKS_PER_YEAR:-WEEKS_PER_YEAR]
+        a = this_year - this_year.mean(axis=0)
+        b = last_year - last_year.mean(axis=0)
+        denominator = np.sqrt((a * a).sum(axis=0) * (b * b).sum(axis=0))
+        seasonality = np.divide((a * b).sum(axis=0), denominator,
+                                out=np.zeros_like(short_ma), where=denominator > 0)
+    if weeks >= WEEKS_PER_YEAR + 2 * short_window:
+        # The same weeks one year earlier: how much growth the season alone produced
+        end = weeks - WEEKS_PER_YEAR
+        last_short = volumes[end - short_window:end].mean(axis=0)
+        last_previous = volumes[end - 2 * short_window:end - short_window].mean(axis=0)
+        expected_growth = (last_short - last_previous) / (last_previous + 1)
+
+    score = growth - np.clip(seasonality, 0, 1) * expected_growth
+    return TrendScores(
+        volume=volumes[-1].copy(),
+        moving_average=short_ma,
+        growth=growth,
+        momentum=momentum,
+        seasonality=seasonality,
+        score=score,
+    )
+
+
+class TrendEngine:
+    """Scores every keyword once per store version and answers niche top-N queries."""
+
+    def __init__(self, store: TrendStore):
+        self.store = store
+        self._scores: Optional[TrendScores] = None
+        self._scored_version: Optional[Tuple[int, int]] = None
+        self._token_index: Optional[TokenIndex] = None
+
+    @property
+    def enabled(self) -> bool:
+        self.store.refresh()
+        return len(self.store.weeks) >= settings.TREND_MIN_WEEKS
+
+    @property
+    def unscored_keywords(self) -> int:
+        """Keywords the next query has to score; 0 while the cached scores are current."""
+        self.store.refresh()
+        if self._scores is not None and self._scored_version == self.store.version:
+            return 0
+        return len(self.store.keywords)
+
+    def scores(self) -> TrendScores:
+        self.store.refresh()
+        if self._scores is None or self._scored_version != self.store.version:
+            if self._scored_version is None or self._scored_version[1] != len(self.store.keywords):
+                self._token_index = None
+            self._scores = self._compute()
+            self._scored_version = self.store.version
+        return self._scores
+
+    def _compute(self) -> TrendScores:
+        matrix = self.store.matrix()
+        weeks, keywords = matrix.shape
+        # Only the trailing weeks any metric looks at are read from disk
+        history = matrix[max(0, weeks - 2 * WEEKS_PER_YEAR):]
+        blocks = [
+            score_block(history[:, start:start + BLOCK_SIZE],
+                        settings.TREND_SHORT_WINDOW, settings.TREND_LONG_WINDOW)
+            for start in range(0, keywords, BLOCK_SIZE)
+        ]
+        if not blocks:
+            empty = np.zeros(0, dtype=np.float32)
+            return TrendScores(*([empty] * len(TrendScores._fields)))
+        return TrendScores(*(np.concatenate(column) for column in zip(*blocks)))
+
+    def _tokens(self) -> TokenIndex:
+        if self._token_index is None:
+            self._token_index = self.store.token_index()
+        return self._token_index
+
+    def _niche_ids(self, niche_terms: Iterable[str]) -> np.ndarray:
+        # A keyword matches a niche term when it contains all of the term's words
+        tokens = self._tokens()
+        matches = []
+        for term in niche_terms:
+            words = term.lower().split()
+            if not words:
+                continue
+            ids = tokens.lookup(words[0])
+            for word in words[1:]:
+                ids = np.intersect1d(ids, tokens.lookup(word), assume_unique=True)
+            matches.append(ids)
+        if not matches:
+            return np.zeros(0, dtype=np.int64)
+        return np.unique(np.concatenate(matches))
+
+    def top_rising(self, niche_terms: Iterable[str], n: int = 10,
+                   min_volume: Optional[float] = None) -> List[KeywordTrend]:
+        if min_volume is None:
+            min_volume = settings.TREND_MIN_VOLUME
+        scores = self.scores()
+        ids = self._niche_ids(niche_terms)
+        ids = ids[(scores.moving_average[ids] >= min_volume) & (scores.score[ids] > 0)]
+        if len(ids) > n:
+            ids = ids[np.argpartition(-scores.score[ids], n - 1)[:n]]
+        ids = ids[np.argsort(-scores.score[ids])]
+        return [
+            KeywordTrend(
+                keyword=self.store.keywords[i],
+                volume=int(scores.volume[i]),
+                moving_average=float(scores.moving_average[i]),
+                growth=float(scores.growth[i]),
+                momentum=float(scores.momentum[i]),
+                seasonality=float(scores.seasonality[i]),
+                score=float(scores.score[i])
+            )
+            for i in ids
+        ]
+
+
+trend_engine = TrendEngine(TrendStore(settings.TREND_STORE_DIR))
+
+
+def top_rising(niche_terms: List[str], n: int) -> List[KeywordTrend]:
+    """`trend_engine.top_rising` as a module-level function, so a process pool can run it."""
+    return trend_engine.top_rising(niche_terms, n)
+
+
+def _read_snapshot(path: Path) -> Dict[str, float]:
+    volumes = {}
+    with path.open(newline="") as f:
+        for row in csv.reader(f):
+            try:
+                volumes[row[0]] = float(row[1])
+            except (IndexError, ValueError):
+                continue  # header or malformed row
+    return volumes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keyword trend store")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest = commands.add_parser("ingest", help="Append a weekly keyword,volume CSV snapshot")
+    ingest.add_argument("week", type=date.fromisoformat)
+    ingest.add_argument("snapshot", type=Path)
+    top = commands.add_parser("top", help="Top rising keywords for niche terms")
+    top.add_argument("terms", nargs="+")
+    top.add_argument("-n", type=int, default=settings.TREND_TOP_N)
+    args = parser.parse_args()
+
+    if args.command == "ingest":
+        trend_engine.store.append_week(args.week, _read_snapshot(args.snapshot))
+        trend_engine.store.token_index()  # rebuild now rather than on the first API query
+        weeks, keywords = trend_engine.store.version
+        print(f"Stored {weeks} weeks x {keywords} keywords in {trend_engine.store.directory}")
+    else:
+        for trend in trend_engine.top_rising(args.terms, args.n):
+            print(f"{trend.keyword:<40} {trend.volume:>9} {trend.growth:>+8.1%} {trend.seasonality:>6.2f}")
+
+
+if __name__ == "__main__":
+    main()
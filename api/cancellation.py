@@ -0,0 +1,98 @@
+import asyncio
+from collections import defaultdict
+from typing import Awaitable, Dict, Optional, TypeVar
+
+from fastapi import Request
+
+from agents.llm_resilience import DeadlineExceeded, request_deadline
+from config.settings import settings
+
+T = TypeVar("T")
+
+# Clients may ask for a shorter deadline than REQUEST_TIMEOUT (never a longer one)
+TIMEOUT_HEADER = "x-request-timeout"
+
+
+class ClientDisconnected(Exception):
+    """Raised when the client goes away before its response is ready."""
+
+
+class RequestStats:
+    """Per-endpoint outcome counters, including work abandoned mid-flight."""
+
+    FIELDS = ("completed", "failed", "deadline_exceeded", "disconnected")
+
+    def __init__(self):
+        self._counters: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {field: 0 for field in self.FIELDS}
+        )
+        self.in_flight = 0  # requests currently inside run_cancellable
+
+    def incr(self, endpoint: str, field: str):
+        self._counters[endpoint][field] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        return {endpoint: dict(counters) for endpoint, counters in self._counters.items()}
+
+
+request_stats = RequestStats()
+
+
+def request_timeout(request: Request) -> float:
+    requested = request.headers.get(TIMEOUT_HEADER)
+    try:
+        seconds = float(requested) if requested else settings.REQUEST_TIMEOUT
+    except ValueError:
+        seconds = settings.REQUEST_TIMEOUT
+    return min(max(seconds, 0.0), settings.REQUEST_TIMEOUT)
+
+
+async def _wait_for_disconnect(request: Request):
+    # The body has been read already, so the next ASGI message is the disconnect
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def run_cancellable(request: Request, work: Awaitable[T], endpoint: Optional[str] = None) -> T:
+    """Run `work` under the request deadline, cancelling it on timeout or client disconnect.
+
+    Cancellation propagates through every pending await, so in-flight LLM
+    calls, crawls and concurrent sub-tasks stop instead of finishing for
+    nobody.
+    """
+    endpoint = endpoint or request.url.path
+    timeout = request_timeout(request)
+    with request_deadline(timeout):
+        # The task copies the context here, so every call inside sees the deadline
+        task = asyncio.ensure_future(work)
+    watcher = asyncio.ensure_future(_wait_for_disconnect(request))
+    request_stats.in_flight += 1
+    try:
+        done, _ = await asyncio.wait(
+            {task, watcher}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+        )
+        if task in done:
+            try:
+                result = task.result()
+            except DeadlineExceeded:
+                request_stats.incr(endpoint, "deadline_exceeded")
+                raise
+            except Exception:
+                request_stats.incr(endpoint, "failed")
+                raise
+            request_stats.incr(endpoint, "completed")
+            return result
+        if watcher in done:
+            request_stats.incr(endpoint, "disconnected")
+            raise ClientDisconnected(f"Client disconnected from {endpoint}")
+        request_stats.incr(endpoint, "deadline_exceeded")
+        raise DeadlineExceeded(f"Request deadline of {timeout:g}s reached")
+    finally:
+        watcher.cancel()
+        if not task.done():
+            task.cancel()
+            # Let the work unwind (and record what it abandoned) before responding
+            await asyncio.gather(task, return_exceptions=True)
+        request_stats.in_flight -= 1
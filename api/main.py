@@ -1,8 +1,29 @@
-from fastapi import FastAPI, HTTPException, Body
+import asyncio
+import logging
+from tempfile import SpooledTemporaryFile
+from typing import AsyncIterator, Literal
+from fastapi import FastAPI, HTTPException, Body, Query, Request
+from fastapi.responses import StreamingResponse
 from models.schemas import ArticleRequest, APIResponse
 from fastapi.middleware.cors import CORSMiddleware
 from models.schemas import *
 from workflow.seo_workflow import SEOWorkflow
+from workflow.plan_store import PlanStore
+from workflow.article_store import ArticleStore
+from workflow.prefetch import PrefetchScheduler
+from api.responses import json_response
+from api.profiling import ProfilingMiddleware
+from api.cancellation import ClientDisconnected, request_stats, run_cancellable
+from analysis.performance import score_articles
+from services.crawler import competitor_crawler
+from services.serp_client import serp_client
+from services.exporter import ExportRecord, article_exporter, records_from_ndjson
+from agents.llm_resilience import DeadlineExceeded, llm_stats
+from agents.offload import loop_lag, run_cpu, shutdown_executor
+from analysis.trends import trend_engine
+from agents.quality_reviewer_agent import paragraph_cache
+from agents.market_research_agent import research_cache
+from config.settings import settings
 import uvicorn
 
 app = FastAPI(
@@ -19,56 +40,253 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(ProfilingMiddleware)
 
 # Initialize workflow
 seo_workflow = SEOWorkflow()
+logger = logging.getLogger(__name__)
+plan_store = PlanStore(max_plans=settings.MAX_STORED_PLANS)
+article_store = ArticleStore(max_articles=settings.MAX_STORED_ARTICLES)
+prefetch_scheduler = PrefetchScheduler(
+    seo_workflow, plan_store, article_store,
+    busy=lambda: request_stats.in_flight >= settings.PREFETCH_MAX_INTERACTIVE
+)
+
+@app.on_event("startup")
+async def startup():
+    loop_lag.start()
+    prefetch_scheduler.start()
+    if trend_engine.enabled:
+        # Score the trend store in the background so the first research request doesn't wait
+        app.state.trend_warmup = asyncio.get_running_loop().run_in_executor(None, trend_engine.scores)
+        app.state.trend_warmup.add_done_callback(_log_trend_warmup)
+
+def _log_trend_warmup(future: asyncio.Future):
+    if not future.cancelled() and future.exception() is not None:
+        logger.error("Trend score warm-up failed", exc_info=future.exception())
+
+@app.on_event("shutdown")
+async def shutdown():
+    await loop_lag.stop()
+    await prefetch_scheduler.stop()
+    await competitor_crawler.close()
+    await serp_client.close()
+    shutdown_executor()
 
 @app.get("/")
 async def root():
     return {"message": "SEO Content Generator API is running!"}
 
 @app.post("/generate-plan", response_model=dict)
-async def generate_plan(business_input: BusinessInput = Body(...)):
+async def generate_plan(request: Request, business_input: BusinessInput = Body(...)):
     """Generate complete SEO content plan"""
     try:
-        result = await seo_workflow.generate_complete_plan(business_input)
-        return {"success": True, "data": result}
+        result = await run_cancellable(
+            request, seo_workflow.generate_complete_plan(business_input)
+        )
+        plan_id = plan_store.add(result)
+        prefetch_scheduler.add_plan(plan_id, result)
+        return await json_response(request, {"success": True, "plan_id": plan_id, "data": result})
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except ClientDisconnected as e:
+        # Nobody is listening; 499 only shows up in access logs
+        raise HTTPException(status_code=499, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/plans/{plan_id}", response_model=dict)
+async def get_plan(request: Request, plan_id: str):
+    """Fetch a generated plan; send If-None-Match to get 304 when unchanged"""
+    plan = plan_store.get(plan_id)
+    if plan is None:
+        raise HTTPException(status_code=404, detail="Plan not found")
+    return await json_response(request, {"success": True, "plan_id": plan_id, "data": plan})
+
+def _export_response(records: AsyncIterator[ExportRecord], archive: str, template: str,
+                     name: str) -> StreamingResponse:
+    if archive == "zip":
+        return StreamingResponse(
+            article_exporter.stream_zip(records, template), media_type="application/zip",
+            headers={"Content-Disposition": f'attachment; filename="{name}.zip"'}
+        )
+    return StreamingResponse(
+        article_exporter.stream_ndjson(records, template), media_type="application/x-ndjson"
+    )
+
+def _entry_request(entry: dict) -> tuple:
+    return entry["title"], entry["keywords"].split(", ")
+
+async def _calendar_records(plan: dict, max_generate: int = 0) -> AsyncIterator[ExportRecord]:
+    # Articles already written (stored or being prefetched) are served first;
+    # at most `max_generate` of the rest are written now, a few at a time
+    schedule = plan["plan"]["content_schedule"]
+    missing = [entry for entry in schedule if not prefetch_scheduler.has(*_entry_request(entry))]
+    to_generate = {id(entry) for entry in missing[:max_generate]}
+    generated = seo_workflow.iter_calendar_articles(
+        missing[:max_generate], settings.EXPORT_CONCURRENCY,
+        context=seo_workflow.article_context(plan)
+    )
+    try:
+        for entry in schedule:
+            if id(entry) in to_generate:
+                _, stored = await generated.__anext__()
+                if not isinstance(stored, Exception):
+                    # Kept like a prefetched article, so later exports and /generate-article reuse it
+                    stored["scheduled_date"] = entry["date"]
+                    article_store.add(article_store.key(*_entry_request(entry)), stored)
+                    entry["status"] = "ready"
+            else:
+                stored = await prefetch_scheduler.lookup(*_entry_request(entry))
+            if isinstance(stored, Exception):
+                result = stored
+            elif stored is not None:
+                result = BlogArticle.model_validate(stored["article"])
+            else:
+                result = LookupError("Not written yet; POST to this URL to generate missing articles")
+            if isinstance(result, Exception):
+                yield ExportRecord(entry["title"], error=str(result))
+            else:
+                yield ExportRecord(entry["title"], result, entry["date"])
+    finally:
+        await generated.aclose()
+
+@app.get("/plans/{plan_id}/export")
+async def export_plan(plan_id: str, format: Literal["zip", "ndjson"] = "zip",
+                      template: Literal["html", "markdown"] = "html"):
+    """Stream a plan's already written calendar articles as rendered files (no generation)"""
+    plan = plan_store.get(plan_id)
+    if plan is None:
+        raise HTTPException(status_code=404, detail="Plan not found")
+    records = _calendar_records(plan)
+    return _export_response(records, format, template, f"plan-{plan_id}")
+
+@app.post("/plans/{plan_id}/export")
+async def export_plan_generating(plan_id: str, format: Literal["zip", "ndjson"] = "zip",
+                                 template: Literal["html", "markdown"] = "html",
+                                 max_generate: int = Query(settings.EXPORT_MAX_GENERATE, ge=0,
+                                                           le=settings.EXPORT_MAX_GENERATE)):
+    """Like GET, but first writes up to `max_generate` calendar articles that don't exist yet"""
+    plan = plan_store.get(plan_id)
+    if plan is None:
+        raise HTTPException(status_code=404, detail="Plan not found")
+    records = _calendar_records(plan, max_generate)
+    return _export_response(records, format, template, f"plan-{plan_id}")
+
+@app.post("/export")
+async def export_articles(request: Request, format: Literal["zip", "ndjson"] = "zip",
+                          template: Literal["html", "markdown"] = "html"):
+    """Render an NDJSON body of BlogArticle objects and stream them back as files"""
+    # Spool the upload first: the streaming response owns the receive channel afterwards
+    spool = SpooledTemporaryFile(max_size=settings.EXPORT_SPOOL_MAX_BYTES)
+    async for chunk in request.stream():
+        spool.write(chunk)
+    spool.seek(0)
+
+    async def records() -> AsyncIterator[ExportRecord]:
+        try:
+            async for record in records_from_ndjson(spool):
+                yield record
+        finally:
+            spool.close()
+
+    return _export_response(records(), format, template, "articles")
+
+async def _article(request: ArticleRequest):
+    # Calendar articles written ahead of time by the prefetch scheduler are served as-is
+    prefetched = await prefetch_scheduler.lookup(request.title, request.keywords)
+    if prefetched is not None:
+        return prefetched
+    return await seo_workflow.generate_article(request.title, request.keywords, request.content_type)
+
 @app.post("/generate-article", response_model=APIResponse)
-async def generate_article(request: ArticleRequest = Body(...)):
+async def generate_article(http_request: Request, request: ArticleRequest = Body(...)):
     try:
-        result = await seo_workflow.generate_article(
-            request.title,
-            request.keywords,
-            request.content_type
-        )
-        return {"success": True, "data": result}
+        result = await run_cancellable(http_request, _article(request))
+        return await json_response(http_request, {"success": True, "data": result})
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except ClientDisconnected as e:
+        raise HTTPException(status_code=499, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/revise-article", response_model=APIResponse)
+async def revise_article(http_request: Request, request: ArticleRevisionRequest = Body(...)):
+    """Fix a reviewed article by rewriting only the sections its suggestions point at"""
+    try:
+        result = await run_cancellable(http_request, seo_workflow.revise_article(
+            request.article,
+            request.quality_report,
+            request.performance_estimate
+        ))
+        return await json_response(http_request, {"success": True, "data": result})
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except ClientDisconnected as e:
+        raise HTTPException(status_code=499, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def _evaluate(article: BlogArticle):
+    quality_report = await seo_workflow.quality_reviewer_agent.execute(article)
+    performance_estimate = await seo_workflow.performance_estimator_agent.execute(
+        article, quality_report
+    )
+    return quality_report, performance_estimate
+
 @app.post("/evaluate-content", response_model=dict)
-async def evaluate_content(article: BlogArticle = Body(...)):
+async def evaluate_content(request: Request, article: BlogArticle = Body(...)):
     """Evaluate existing content quality"""
     try:
-        quality_report = await seo_workflow.quality_reviewer_agent.execute(article)
-        performance_estimate = await seo_workflow.performance_estimator_agent.execute(
-            article, quality_report
+        quality_report, performance_estimate = await run_cancellable(
+            request, _evaluate(article)
         )
-        return {
+        return await json_response(request, {
             "success": True,
             "data": {
-                "quality_report": quality_report.dict(),
-                "performance_estimate": performance_estimate.dict()
+                "quality_report": quality_report,
+                "performance_estimate": performance_estimate
             }
-        }
+        })
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except ClientDisconnected as e:
+        raise HTTPException(status_code=499, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
+@app.post("/estimate-batch", response_model=dict)
+async def estimate_batch(request: Request, batch: BatchScoreRequest = Body(...)):
+    """Score many articles at once from columnar metrics (no LLM calls)"""
+    scores = await run_cpu(
+        score_articles,
+        batch.seo_score,
+        batch.grammar_score,
+        batch.readability_score,
+        batch.keyword_density_sum,
+        batch.word_count,
+        size=len(batch.seo_score), min_size=settings.CPU_OFFLOAD_MIN_ROWS
+    )
+    return await json_response(request, {"success": True, "data": scores})
+    
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "message": "API is running properly"}
 
+@app.get("/metrics")
+async def metrics():
+    """LLM call counters (retries, timeouts, hedges) per agent task"""
+    return {
+        "llm_calls": llm_stats.snapshot(),
+        "requests": request_stats.snapshot(),
+        "paragraph_cache": paragraph_cache.stats(),
+        "research_cache": research_cache.metrics(),
+        "serp": serp_client.stats,
+        "prefetch": prefetch_scheduler.snapshot(),
+        "event_loop_lag": loop_lag.stats()
+    }
+
 
 
 if __name__ == "__main__":
@@ -0,0 +1,175 @@
+"""Opt-in per-request profiling.
+
+A request is profiled when it carries `X-Profile-Token: <PROFILE_ADMIN_TOKEN>`
+or is picked by PROFILE_SAMPLE_RATE. While it runs, a background thread
+samples the event loop thread's stack every PROFILE_INTERVAL seconds, and
+agent stages record their start/end times. Both are written as one
+speedscope file (https://www.speedscope.app) to PROFILE_DIR: a sampled
+"CPU" flamegraph and an evented "Async stages" timeline. Note that the
+sampler sees everything running on the event loop, including other
+requests served concurrently.
+
+Requests that are not profiled pass straight through.
+"""
+import asyncio
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from agents.timeline import StageTimeline
+from config.settings import settings
+
+Frame = Tuple[str, str, int]
+
+
+class StackSampler(threading.Thread):
+    def __init__(self, target_thread_id: int, interval: float):
+        super().__init__(daemon=True)
+        self.target_thread_id = target_thread_id
+        self.interval = interval
+        self.samples: List[Tuple[float, Tuple[Frame, ...]]] = []
+        self._stopped = threading.Event()
+        self.origin = time.perf_counter()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.target_thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                frame = frame.f_back
+            self.samples.append((time.perf_counter() - self.origin, tuple(reversed(stack))))
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+
+def _assign_lanes(spans: List[Tuple[str, float, float]]) -> List[List[Tuple[str, float, float]]]:
+    # Evented profiles must nest, but concurrent stages overlap: split them
+    # into lanes in which every pair of spans is either nested or disjoint
+    lanes: List[List[Tuple[str, float, float]]] = []
+    open_ends: List[List[float]] = []
+    for span in sorted(spans, key=lambda s: (s[1], -s[2])):
+        _, start, end = span
+        for lane, stack in zip(lanes, open_ends):
+            while stack and stack[-1] <= start:
+                stack.pop()
+            if not stack or stack[-1] >= end:
+                lane.append(span)
+                stack.append(end)
+                break
+        else:
+            lanes.append([span])
+            open_ends.append([end])
+    return lanes
+
+
+def build_speedscope(name: str, sampler: StackSampler, timeline: StageTimeline,
+                     duration: float) -> dict:
+    frames: List[dict] = []
+    frame_index: Dict[Frame, int] = {}
+
+    def index_of(frame: Frame) -> int:
+        if frame not in frame_index:
+            frame_index[frame] = len(frames)
+            frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+        return frame_index[frame]
+
+    interval_ms = sampler.interval * 1000
+    profiles = [{
+        "type": "sampled",
+        "name": "CPU samples (event loop thread)",
+        "unit": "milliseconds",
+        "startValue": 0,
+        "endValue": duration * 1000,
+        "samples": [[index_of(f) for f in stack] for _, stack in sampler.samples],
+        "weights": [interval_ms] * len(sampler.samples),
+    }]
+
+    for lane_number, lane in enumerate(_assign_lanes(timeline.spans), start=1):
+        events, stack = [], []
+        for stage_name, start, end in lane:
+            while stack and stack[-1][1] <= start:
+                frame, closed_at = stack.pop()
+                events.append({"type": "C", "frame": frame, "at": closed_at * 1000})
+            frame = index_of((stage_name, "<stage>", 0))
+            events.append({"type": "O", "frame": frame, "at": start * 1000})
+            stack.append((frame, end))
+        while stack:
+            frame, closed_at = stack.pop()
+            events.append({"type": "C", "frame": frame, "at": closed_at * 1000})
+        profiles.append({
+            "type": "evented",
+            "name": f"Async stages (lane {lane_number})",
+            "unit": "milliseconds",
+            "startValue": 0,
+            "endValue": duration * 1000,
+            "events": events,
+        })
+
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": "seo-content-generator",
+        "shared": {"frames": frames},
+        "profiles": profiles,
+    }
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling requests selected by admin header or sampling."""
+
+    def __init__(self, app):
+        self.app = app
+
+    def _should_profile(self, scope) -> bool:
+        if scope["type"] != "http" or scope["path"] not in settings.PROFILE_PATHS:
+            return False
+        if settings.PROFILE_ADMIN_TOKEN:
+            for key, value in scope["headers"]:
+                if key == b"x-profile-token" and value.decode() == settings.PROFILE_ADMIN_TOKEN:
+                    return True
+        return settings.PROFILE_SAMPLE_RATE > 0 and random.random() < settings.PROFILE_SAMPLE_RATE
+
+    async def __call__(self, scope, receive, send):
+        if not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        name = f"{scope['method']} {scope['path']}"
+        path = Path(settings.PROFILE_DIR) / (
+            f"{time.strftime('%Y%m%d-%H%M%S')}{scope['path'].replace('/', '_')}-{uuid.uuid4().hex[:8]}.speedscope.json"
+        )
+
+        async def send_with_header(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-file", str(path).encode())
+                ]
+            await send(message)
+
+        timeline = StageTimeline()
+        sampler = StackSampler(threading.get_ident(), settings.PROFILE_INTERVAL)
+        sampler.origin = timeline.origin
+        token = timeline.activate()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_header)
+        finally:
+            sampler.stop()
+            StageTimeline.deactivate(token)
+            duration = time.perf_counter() - timeline.origin
+            profile = build_speedscope(name, sampler, timeline, duration)
+            await asyncio.get_running_loop().run_in_executor(None, _write_profile, path, profile)
+
+
+def _write_profile(path: Path, profile: dict):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(profile))
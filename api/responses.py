@@ -0,0 +1,93 @@
+import gzip
+import hashlib
+from typing import Any, List, Optional
+
+import orjson
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+from agents.offload import run_cpu
+from config.settings import settings
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; fall back to gzip only
+    brotli = None
+
+
+def _default(obj: Any) -> Any:
+    # Serialize models directly, without FastAPI re-validating them
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(payload: Any) -> bytes:
+    return orjson.dumps(payload, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def _accepted_encodings(accept_encoding: str) -> List[str]:
+    accepted = []
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                continue
+        if name and quality > 0:
+            accepted.append(name.strip().lower())
+    return accepted
+
+
+def _choose_encoding(request: Request, size: int) -> Optional[str]:
+    if size < settings.RESPONSE_COMPRESSION_MIN_BYTES:
+        return None
+    accepted = _accepted_encodings(request.headers.get("accept-encoding", ""))
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in candidates
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.RESPONSE_COMPRESSION_LEVEL)
+    return gzip.compress(body, compresslevel=settings.RESPONSE_COMPRESSION_LEVEL)
+
+
+async def json_response(request: Request, payload: Any, status_code: int = 200) -> Response:
+    """orjson-encoded response with content negotiation and a strong ETag."""
+    body = dumps(payload)
+    encoding = _choose_encoding(request, len(body))
+    digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+    # Each encoding is a distinct representation, so it gets its own strong tag
+    etag = f'"{digest}-{encoding}"' if encoding else f'"{digest}"'
+    headers = {"ETag": etag, "Vary": "Accept-Encoding"}
+
+    # Conditional GETs (e.g. clients polling a stored plan) skip the body
+    if request.method in ("GET", "HEAD") and status_code == 200 and _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    if encoding is not None:
+        # Compressing large plans is the slow part; zlib and brotli release the GIL
+        body = await run_cpu(_compress, body, encoding, size=len(body))
+        headers["Content-Encoding"] = encoding
+
+    return Response(
+        content=body, status_code=status_code,
+        media_type="application/json", headers=headers
+    )
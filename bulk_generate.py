@@ -0,0 +1,220 @@
+"""Offline bulk plan generation over a JSONL file of BusinessInput records.
+
+Usage:
+    python bulk_generate.py businesses.jsonl plans.jsonl --concurrency 8
+
+Each input line is a BusinessInput object, optionally with an "id" field
+(defaults to the line number). Results are appended to the output JSONL as
+they complete; re-running the same command skips records that already have
+a successful result in the output file, so an interrupted run resumes. When
+a run ends, the output keeps only the last record per id, so a failure that
+was retried successfully leaves just the success.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Set, Tuple
+
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from agents.llm_resilience import llm_stats, request_deadline
+from config.settings import settings
+from models.schemas import BusinessInput
+from workflow.seo_workflow import SEOWorkflow
+
+
+def _output_id(record) -> Optional[str]:
+    if isinstance(record, dict) and isinstance(record.get("id"), str):
+        return record["id"]
+    return None
+
+
+def load_completed(output_path: Path) -> Set[str]:
+    """Ids with a successful result, dropping a partially written last line."""
+    completed = set()
+    if not output_path.exists():
+        return completed
+    partial_at = None
+    unterminated = False
+    with output_path.open("rb") as f:
+        offset = 0
+        for line_number, line in enumerate(f, start=1):
+            unterminated = not line.endswith(b"\n")
+            try:
+                record = json.loads(line)
+            except ValueError:
+                if unterminated:
+                    # Interrupted mid-write; the record will be generated again
+                    partial_at = offset
+                else:
+                    print(f"⚠️  Skipping unreadable line {line_number} of {output_path}")
+                continue
+            finally:
+                offset += len(line)
+            record_id = _output_id(record)
+            if record_id is None:
+                print(f"⚠️  Skipping line {line_number} of {output_path}: not a record with an id")
+            elif record.get("success"):
+                completed.add(record_id)
+    if partial_at is not None:
+        with output_path.open("r+b") as f:
+            f.truncate(partial_at)
+    elif unterminated:
+        # A complete last record without its newline: the next append would be glued onto it
+        with output_path.open("ab") as f:
+            f.write(b"\n")
+    return completed
+
+
+def compact_output(output_path: Path):
+    """Keep only the last record per id, so retried failures don't leave duplicates.
+
+    Lines that aren't records with an id are kept as they are.
+    """
+    if not output_path.exists():
+        return
+    last_line: Dict[str, int] = {}
+    duplicates = False
+    with output_path.open("rb") as f:
+        for line_number, line in enumerate(f, start=1):
+            try:
+                record_id = _output_id(json.loads(line))
+            except ValueError:
+                continue
+            if record_id is not None:
+                duplicates = duplicates or record_id in last_line
+                last_line[record_id] = line_number
+    if not duplicates:
+        return
+    tmp_path = output_path.with_suffix(output_path.suffix + ".tmp")
+    with output_path.open("rb") as f, tmp_path.open("wb") as out:
+        for line_number, line in enumerate(f, start=1):
+            try:
+                record_id = _output_id(json.loads(line))
+            except ValueError:
+                record_id = None
+            if record_id is None or last_line[record_id] == line_number:
+                out.write(line)
+    tmp_path.replace(output_path)
+
+
+def read_records(input_path: Path) -> Iterator[Tuple[str, str]]:
+    with input_path.open() as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            record_id = f"line-{line_number}"
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # Still yielded, so the failure is recorded against the line like any other
+                print(f"⚠️  Line {line_number} of {input_path} is not valid JSON")
+                yield record_id, line
+                continue
+            if not isinstance(record, dict):
+                print(f"⚠️  Line {line_number} of {input_path} is not a JSON object")
+            elif "id" in record:
+                if isinstance(record["id"], (str, int)) and not isinstance(record["id"], bool):
+                    record_id = str(record["id"])
+                else:
+                    print(f"⚠️  Line {line_number} of {input_path} has an invalid id "
+                          f"{record['id']!r}; using {record_id}")
+            yield record_id, line
+
+
+class BulkRunner:
+    def __init__(self, output_path: Path, concurrency: int, timeout: Optional[float]):
+        self.output_path = output_path
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.workflow = SEOWorkflow()
+        self.succeeded = 0
+        self.failed = 0
+        self.skipped = 0
+
+    async def run(self, input_path: Path):
+        completed = load_completed(self.output_path)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+
+        try:
+            with self.output_path.open("a") as output:
+                workers = [
+                    asyncio.create_task(self._worker(queue, output))
+                    for _ in range(self.concurrency)
+                ]
+                # Stream the input so memory stays bounded for large files
+                for record_id, line in read_records(input_path):
+                    if record_id in completed:
+                        self.skipped += 1
+                        continue
+                    await queue.put((record_id, line))
+                for _ in workers:
+                    await queue.put(None)
+                await asyncio.gather(*workers)
+        finally:
+            compact_output(self.output_path)
+
+    async def _worker(self, queue: asyncio.Queue, output):
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            record_id, line = item
+            result = await self._generate(record_id, line)
+            # Single-threaded event loop: whole lines are written without interleaving
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+
+    async def _generate(self, record_id: str, line: str) -> dict:
+        started = time.monotonic()
+        try:
+            business_input = BusinessInput.model_validate_json(line)
+            with request_deadline(self.timeout):
+                plan = await self.workflow.generate_complete_plan(business_input)
+            self.succeeded += 1
+            print(f"✅ {record_id} ({time.monotonic() - started:.1f}s)")
+            return {"id": record_id, "success": True, "data": plan}
+        except Exception as e:
+            self.failed += 1
+            print(f"❌ {record_id}: {e}")
+            return {"id": record_id, "success": False, "error": str(e)}
+
+    def summary(self, elapsed: float) -> str:
+        processed = self.succeeded + self.failed
+        rate = processed / elapsed * 60 if elapsed > 0 else 0.0
+        llm_calls = llm_stats.snapshot()["total"]
+        return "\n".join([
+            "=" * 50,
+            f"Processed:  {processed} ({self.succeeded} succeeded, {self.failed} failed)",
+            f"Skipped:    {self.skipped} already completed",
+            f"Elapsed:    {elapsed:.1f}s",
+            f"Throughput: {rate:.1f} plans/min at concurrency {self.concurrency}",
+            f"LLM calls:  {llm_calls['calls']} ({llm_calls['retries']} retries, "
+            f"{llm_calls['cache_hits']} cache hits)",
+        ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-generate SEO content plans from JSONL")
+    parser.add_argument("input", type=Path, help="JSONL file of BusinessInput records")
+    parser.add_argument("output", type=Path, help="JSONL file results are appended to")
+    parser.add_argument("--concurrency", type=int, default=settings.BULK_CONCURRENCY,
+                        help="Number of plans generated in parallel")
+    parser.add_argument("--timeout", type=float, default=settings.REQUEST_TIMEOUT,
+                        help="Deadline in seconds for each plan")
+    args = parser.parse_args()
+
+    runner = BulkRunner(args.output, max(1, args.concurrency), args.timeout)
+    started = time.monotonic()
+    try:
+        asyncio.run(runner.run(args.input))
+    except KeyboardInterrupt:
+        print("\n👋 Interrupted - re-run the same command to resume")
+    print(runner.summary(time.monotonic() - started))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import os
+import json
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -13,8 +14,121 @@ class Settings:
     MAX_TOKENS = 2000
     TEMPERATURE = 0.7
     
+    # Per-task model routing: "<AgentName>.<task>" (or "<AgentName>") -> overrides
+    # of MODEL_NAME / MAX_TOKENS / TEMPERATURE. Temperature 0 routes are cached.
+    LLM_ROUTES = {
+        "QualityReviewer.paragraph_review": {"max_tokens": 800, "temperature": 0.0},
+        "PerformanceEstimator.competition": {"max_tokens": 5, "temperature": 0.0},
+        "MarketResearch.research": {"max_tokens": 700},
+        "SEOStrategist.keyword_strategy": {"max_tokens": 1000},
+        "ContentPlanner.more_titles": {"max_tokens": 1500},
+        "BlogWriter.meta_description": {"max_tokens": 80},
+        "BlogWriter.revise_section": {"max_tokens": 1000},
+        **json.loads(os.getenv("LLM_ROUTES_JSON", "{}"))
+    }
+    LLM_RESPONSE_CACHE_SIZE = 1024
+    LLM_STRUCTURED_REPAIRS = 2
+    
+    # LLM Resilience Settings
+    LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", 60))
+    LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 3))
+    LLM_BACKOFF_BASE = 0.5
+    LLM_BACKOFF_MAX = 8.0
+    LLM_HEDGE_ENABLED = os.getenv("LLM_HEDGE_ENABLED", "false").lower() == "true"
+    LLM_HEDGE_PERCENTILE = 0.95
+    LLM_HEDGE_MIN_SAMPLES = 20
+    LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 32))  # in-flight calls per process
+    REQUEST_TIMEOUT = float(os.getenv("REQUEST_TIMEOUT", 170))
+    
     # Content Settings
     DEFAULT_ARTICLE_LENGTH = 1500
     MAX_KEYWORDS_PER_ARTICLE = 5
+    MAX_CALENDAR_DAYS = 365
+    CALENDAR_TITLE_BATCH_SIZE = 30
+    # Review article sections while the rest of the article is still being written
+    ARTICLE_PIPELINE = os.getenv("ARTICLE_PIPELINE", "false").lower() == "true"
+    
+    # Request Profiling Settings (off unless a token or sample rate is set)
+    PROFILE_ADMIN_TOKEN = os.getenv("PROFILE_ADMIN_TOKEN")
+    PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0))
+    PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+    PROFILE_INTERVAL = 0.005
+    PROFILE_PATHS = ["/generate-plan", "/generate-article", "/evaluate-content", "/revise-article"]
+    
+    # API Response Settings
+    RESPONSE_COMPRESSION_MIN_BYTES = 1024
+    RESPONSE_COMPRESSION_LEVEL = 5
+    MAX_STORED_PLANS = 500
+    
+    # Competitor Crawler Settings
+    CRAWLER_USER_AGENT = "SEOContentGeneratorBot/1.0"
+    CRAWLER_TIMEOUT = 15
+    CRAWLER_MAX_CONNECTIONS = 20
+    CRAWLER_MAX_CONNECTIONS_PER_HOST = 2
+    CRAWLER_HOST_DELAY = float(os.getenv("CRAWLER_HOST_DELAY", 1.0))
+    CRAWLER_ROBOTS_TTL = 3600
+    CRAWLER_PAGE_CACHE_SIZE = 500
+    CRAWLER_MAX_REDIRECTS = 5
+    CRAWLER_MAX_PAGE_BYTES = 2 * 1024 * 1024  # larger pages (and robots.txt files) are skipped
+    CRAWLER_MAX_HOSTS = 1000  # hosts whose robots.txt and politeness state are kept
+    # Only for crawling a local fixture server; clients could otherwise reach internal services
+    CRAWLER_ALLOW_PRIVATE_HOSTS = os.getenv("CRAWLER_ALLOW_PRIVATE_HOSTS", "false").lower() == "true"
+    CRAWLER_MAX_HEADINGS = 20
+    MAX_COMPETITOR_URLS = 10
+    
+    # Semantic Research Cache Settings
+    SEMANTIC_CACHE_SIZE = 5000
+    SEMANTIC_CACHE_REUSE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_REUSE_THRESHOLD", 0.92))
+    SEMANTIC_CACHE_SEED_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_SEED_THRESHOLD", 0.75))
+    
+    # Keyword Trend Settings (research uses measured trends once enough weeks are stored)
+    TREND_STORE_DIR = os.getenv("TREND_STORE_DIR", "data/trends")
+    TREND_MIN_WEEKS = 8
+    TREND_SHORT_WINDOW = 4
+    TREND_LONG_WINDOW = 12
+    TREND_MIN_VOLUME = 50
+    TREND_TOP_N = 10
+    
+    # SERP Data Settings (disabled unless both URL and key are set)
+    SERP_API_URL = os.getenv("SERP_API_URL")
+    SERP_TIMEOUT = 20
+    SERP_BATCH_SIZE = 50
+    SERP_BATCH_WINDOW = 0.02
+    SERP_CACHE_DIR = os.getenv("SERP_CACHE_DIR", ".cache/serp")
+    SERP_CACHE_TTL = 7 * 24 * 3600
+    SERP_MEMORY_CACHE_SIZE = 10000
+    
+    # Quality Review Settings
+    PARAGRAPH_CACHE_SIZE = 20000
+    REVIEW_CHUNK_TOKENS = 600  # article text per concurrent review call
+    REVIEW_MAX_CALLS = int(os.getenv("REVIEW_MAX_CALLS", 8))  # concurrent review calls per article
+    REVISE_MAX_SECTIONS = 4  # sections rewritten per suggestion in revise mode
+    
+    # CPU Offload Settings: "thread", "process" or "inline" (no pool)
+    CPU_POOL = os.getenv("CPU_POOL", "thread")
+    CPU_POOL_WORKERS = int(os.getenv("CPU_POOL_WORKERS", 4))
+    CPU_OFFLOAD_MIN_CHARS = int(os.getenv("CPU_OFFLOAD_MIN_CHARS", 10000))
+    CPU_OFFLOAD_MIN_ROWS = 5000
+    LOOP_LAG_INTERVAL = 0.1
+    
+    # Export Settings
+    EXPORT_TEMPLATE_DIR = os.getenv(
+        "EXPORT_TEMPLATE_DIR",
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "services", "templates")
+    )
+    EXPORT_CONCURRENCY = int(os.getenv("EXPORT_CONCURRENCY", 4))
+    EXPORT_MAX_GENERATE = int(os.getenv("EXPORT_MAX_GENERATE", 20))  # new articles per POST export
+    EXPORT_SPOOL_MAX_BYTES = 1024 * 1024
+    
+    # Background Prefetch Settings: write planned articles ahead of their publish dates (spends LLM budget, so opt-in)
+    PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "false").lower() == "true"
+    PREFETCH_HORIZON_DAYS = int(os.getenv("PREFETCH_HORIZON_DAYS", 7))
+    PREFETCH_DAILY_LLM_CALLS = int(os.getenv("PREFETCH_DAILY_LLM_CALLS", 500))
+    PREFETCH_MAX_INTERACTIVE = 2  # pause while this many interactive requests are in flight
+    PREFETCH_POLL_INTERVAL = 5.0
+    MAX_STORED_ARTICLES = 1000
+    
+    # Bulk Generation Settings
+    BULK_CONCURRENCY = int(os.getenv("BULK_CONCURRENCY", 4))
     
 settings = Settings()
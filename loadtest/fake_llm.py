@@ -0,0 +1,156 @@
+"""Fake chat model for load tests: plausible output after a realistic delay.
+
+Latency is modelled as a log-normal time-to-first-token plus output tokens
+at a fixed decode rate, so long article generations are slow and one-word
+classifications are fast, like the real API. Structured-output prompts get
+a synthetic JSON instance of the schema embedded in the prompt, with as many
+list items as the prompt asks for (numbered "[i]" items, "Generate N" or
+"- field: N ...") and items numbered 1..n in order, as a real model does.
+All randomness comes from one random.Random, so a seed reproduces a run.
+"""
+import asyncio
+import json
+import random
+import re
+from typing import Any, AsyncIterator, Dict, Optional
+
+from agents.base_agent import BaseAgent, LLMRoute
+
+WORDS = (
+    "content marketing strategy audience search engine ranking keyword organic traffic "
+    "guide practical tips brand growth conversion readers value quality research examples "
+    "customers product service niche trends insights plan publish optimize measure results"
+).split()
+SCHEMA_MARKER = "this JSON schema, and nothing else:\n"
+DEFAULT_LIST_SIZE = 3
+
+
+class FakeMessage:
+    def __init__(self, content: str):
+        self.content = content
+
+
+class FakeChatModel:
+    def __init__(self, route: LLMRoute, ttft_median: float, ttft_sigma: float,
+                 tokens_per_second: float, latency_scale: float, error_rate: float,
+                 rng: random.Random):
+        self.route = route
+        self.ttft_median = ttft_median
+        self.ttft_sigma = ttft_sigma
+        self.tokens_per_second = tokens_per_second
+        self.latency_scale = latency_scale
+        self.error_rate = error_rate
+        self.rng = rng
+
+    async def ainvoke(self, messages) -> FakeMessage:
+        system_prompt, user_prompt = messages[0].content, messages[-1].content
+        content = self._respond(system_prompt, user_prompt)
+        output_tokens = len(content.split()) * 4 / 3
+        delay = self._ttft() + output_tokens / self.tokens_per_second
+        await asyncio.sleep(delay * self.latency_scale)
+        if self.rng.random() < self.error_rate:
+            raise asyncio.TimeoutError("Simulated provider timeout")
+        return FakeMessage(content)
+
+    async def astream(self, messages) -> AsyncIterator[FakeMessage]:
+        content = self._respond(messages[0].content, messages[-1].content)
+        await asyncio.sleep(self._ttft() * self.latency_scale)
+        if self.rng.random() < self.error_rate:
+            raise asyncio.TimeoutError("Simulated provider timeout")
+        # Whitespace-preserving pieces of ~8 words, each after its decode time
+        pieces = re.findall(r"(?:\S+\s*){1,8}", content)
+        for piece in pieces:
+            await asyncio.sleep(len(piece.split()) * 4 / 3 / self.tokens_per_second * self.latency_scale)
+            yield FakeMessage(piece)
+
+    def _ttft(self) -> float:
+        return self.rng.lognormvariate(0, self.ttft_sigma) * self.ttft_median
+
+    def _respond(self, system_prompt: str, user_prompt: str) -> str:
+        if SCHEMA_MARKER in system_prompt:
+            schema = json.loads(system_prompt.split(SCHEMA_MARKER, 1)[1])
+            return json.dumps(_instance(schema, schema.get("$defs", {}), self.rng, _list_sizes(user_prompt)))
+        if "Low', 'Medium', or 'High'" in system_prompt:
+            return self.rng.choice(["Low", "Medium", "High"])
+        if "meta description" in system_prompt.lower():
+            return _sentence(25, self.rng)
+        if "revising one section" in system_prompt:
+            heading = user_prompt.split("Section:", 1)[1].strip().split("\n", 1)[0]
+            paragraphs = [" ".join(_sentence(self.rng.randint(8, 14), self.rng) for _ in range(4)) for _ in range(4)]
+            return f"{heading}\n\n" + "\n\n".join(paragraphs)
+        return _article(max(50, int(self.route.max_tokens * 0.75)), self.rng)
+
+
+def _sentence(words: int, rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _article(words: int, rng: random.Random) -> str:
+    sections, written = [], 0
+    while written < words:
+        paragraphs = [" ".join(_sentence(rng.randint(8, 20), rng) for _ in range(3)) for _ in range(3)]
+        sections.append(f"## {_sentence(5, rng)[:-1]}\n\n" + "\n\n".join(paragraphs))
+        written += sum(len(p.split()) for p in paragraphs)
+    return "\n\n".join(sections)
+
+
+def _list_sizes(user_prompt: str) -> Dict[str, int]:
+    """How many items the prompt asks for, per field name ("*" for any list)."""
+    numbered = re.findall(r"^\[(\d+)\]", user_prompt, re.MULTILINE)
+    if numbered:
+        return {"*": len(numbered)}
+    requested = re.search(r"Generate (\d+)", user_prompt)
+    sizes = {"*": int(requested.group(1))} if requested else {}
+    size = None
+    for name, count in re.findall(r"^\s*- (\w+): (\d+)?", user_prompt, re.MULTILINE):
+        # "one ... per title, in the same order" keeps the previous field's size
+        size = int(count) if count else size
+        if size is not None:
+            sizes[name] = size
+    return sizes
+
+
+def _instance(schema: Dict[str, Any], defs: Dict[str, Any], rng: random.Random,
+              sizes: Optional[Dict[str, int]] = None) -> Any:
+    # `sizes` applies to the lists directly under the response object only
+    if "$ref" in schema:
+        return _instance(defs[schema["$ref"].split("/")[-1]], defs, rng, sizes)
+    if "enum" in schema:
+        return rng.choice(schema["enum"])
+    if "const" in schema:
+        return schema["const"]
+    kind = schema.get("type")
+    if kind == "object":
+        instance = {}
+        for name, prop in schema.get("properties", {}).items():
+            size = (sizes or {}).get(name, (sizes or {}).get("*"))
+            instance[name] = _instance(prop, defs, rng, {"*": size} if size else None)
+        return instance
+    if kind == "array":
+        size = max((sizes or {}).get("*", DEFAULT_LIST_SIZE), schema.get("minItems", 0))
+        items = [_instance(schema.get("items", {}), defs, rng) for _ in range(size)]
+        for position, item in enumerate(items, start=1):
+            if isinstance(item, dict) and "index" in item:
+                item["index"] = position
+        return items
+    if kind == "integer":
+        return rng.randint(int(schema.get("minimum", 1)), int(schema.get("maximum", 5)))
+    if kind == "number":
+        return round(rng.uniform(schema.get("minimum", 60), schema.get("maximum", 100)), 1)
+    if kind == "boolean":
+        return rng.random() < 0.5
+    return " ".join(rng.choice(WORDS) for _ in range(4))
+
+
+def install_fake_llm(ttft_median: float = 0.5, ttft_sigma: float = 0.4,
+                     tokens_per_second: float = 60.0, latency_scale: float = 1.0,
+                     error_rate: float = 0.0, rng: Optional[random.Random] = None):
+    """Make every agent use FakeChatModel instead of the OpenAI client."""
+    rng = rng or random.Random()
+
+    def build_llm(self, route: LLMRoute) -> FakeChatModel:
+        return FakeChatModel(route, ttft_median, ttft_sigma, tokens_per_second,
+                             latency_scale, error_rate, rng)
+
+    BaseAgent._build_llm = build_llm
+    BaseAgent._llm_clients.clear()
@@ -0,0 +1,238 @@
+"""HTTP load generator for the API with a fake LLM.
+
+    python -m loadtest.run --rate 5 --duration 60 \\
+        --mix generate-plan=1,generate-article=2,evaluate-content=7 \\
+        --compare loadtest/baseline.json
+
+Requests arrive open-loop (Poisson, --rate per second) for --duration
+seconds, either in-process through the ASGI app or over localhost against a
+uvicorn server started in this process (--mode http). Every agent uses the
+fake LLM from loadtest/fake_llm.py. Per endpoint, the report lists
+throughput, p50/p95/p99 latency and error rate; --save-baseline writes it as
+JSON, and --compare fails (exit code 1) when p95 latency, the share of the
+offered rate that was completed, or error rate regress beyond --tolerance.
+Raw throughput isn't compared: it follows the random arrivals. --seed seeds
+the arrivals, payloads and fake LLM alike, so a run can be repeated.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import httpx
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from config.settings import settings
+from loadtest.fake_llm import WORDS, install_fake_llm, _article
+
+ENDPOINTS = ("generate-plan", "generate-article", "evaluate-content")
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"Unknown endpoint in mix: {name}")
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+def make_payload(endpoint: str, rng: random.Random) -> dict:
+    # Randomized so caches behave as they would across many distinct clients
+    niche = rng.sample(WORDS, 2)
+    if endpoint == "generate-plan":
+        return {
+            "business_type": rng.choice(["E-commerce", "SaaS", "Agency", "Local service"]),
+            "product_service": " ".join(rng.sample(WORDS, 3)),
+            "target_audience": " ".join(rng.sample(WORDS, 2)),
+            "niche_keywords": [" ".join(niche)],
+        }
+    if endpoint == "generate-article":
+        return {"title": " ".join(rng.sample(WORDS, 6)).title(), "keywords": niche}
+    content = _article(1200, rng)
+    return {
+        "title": " ".join(rng.sample(WORDS, 6)).title(),
+        "meta_description": " ".join(rng.sample(WORDS, 20)),
+        "content": content,
+        "keywords": niche,
+        "word_count": len(content.split()),
+        "readability_score": rng.uniform(40, 80),
+        "seo_score": rng.uniform(40, 90),
+    }
+
+
+async def run_load(client: httpx.AsyncClient, weights: Dict[str, float], rate: float,
+                   duration: float, max_in_flight: int,
+                   rng: random.Random) -> Tuple[Dict[str, List[float]], Dict[str, int], float]:
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    limit = asyncio.Semaphore(max_in_flight)
+    names, probabilities = list(weights), list(weights.values())
+
+    async def one_request(endpoint: str, payload: dict):
+        async with limit:
+            started = time.perf_counter()
+            try:
+                response = await client.post(f"/{endpoint}", json=payload)
+                ok = response.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies[endpoint].append(time.perf_counter() - started)
+            else:
+                errors[endpoint] += 1
+
+    tasks = []
+    started = time.perf_counter()
+    while time.perf_counter() - started < duration:
+        # Drawn here, in arrival order, so the seed fixes the whole schedule
+        endpoint = rng.choices(names, probabilities)[0]
+        tasks.append(asyncio.create_task(one_request(endpoint, make_payload(endpoint, rng))))
+        await asyncio.sleep(rng.expovariate(rate))
+    await asyncio.gather(*tasks)
+    return latencies, errors, time.perf_counter() - started
+
+
+def summarize(latencies: Dict[str, List[float]], errors: Dict[str, int], elapsed: float,
+              duration: float) -> dict:
+    report = {}
+    for endpoint in sorted(set(latencies) | set(errors)):
+        samples = np.array(latencies[endpoint]) if latencies[endpoint] else np.array([np.nan])
+        completed = len(latencies[endpoint])
+        total = completed + errors[endpoint]
+        p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+        report[endpoint] = {
+            "requests": total,
+            "throughput_rps": completed / elapsed,
+            # Completed vs offered rate: falls when requests pile up, whatever the arrivals were
+            "completed_ratio": (completed / elapsed) / (total / duration),
+            "p50_ms": float(p50 * 1000),
+            "p95_ms": float(p95 * 1000),
+            "p99_ms": float(p99 * 1000),
+            "error_rate": errors[endpoint] / total if total else 0.0,
+        }
+    return report
+
+
+def print_report(report: dict):
+    print(f"{'endpoint':<18}{'requests':>9}{'rps':>8}{'done':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for endpoint, row in report.items():
+        print(
+            f"{endpoint:<18}{row['requests']:>9}{row['throughput_rps']:>8.2f}{row['completed_ratio']:>7.0%}"
+            f"{row['p50_ms']:>10.0f}"
+            f"{row['p95_ms']:>10.0f}{row['p99_ms']:>10.0f}{row['error_rate']:>8.1%}"
+        )
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> List[str]:
+    regressions = []
+    for endpoint, base in baseline.items():
+        current = report.get(endpoint)
+        if current is None:
+            continue
+        if current["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{endpoint}: p95 {current['p95_ms']:.0f}ms vs baseline {base['p95_ms']:.0f}ms")
+        if current["completed_ratio"] < base["completed_ratio"] * (1 - tolerance):
+            regressions.append(
+                f"{endpoint}: completed {current['completed_ratio']:.0%} of offered rate "
+                f"vs baseline {base['completed_ratio']:.0%}"
+            )
+        if current["error_rate"] > base["error_rate"] + tolerance / 10:
+            regressions.append(
+                f"{endpoint}: error rate {current['error_rate']:.1%} vs baseline {base['error_rate']:.1%}"
+            )
+    return regressions
+
+
+def start_server(app, port: int):
+    import uvicorn
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread
+
+
+async def main_async(args) -> Tuple[dict, dict]:
+    from api.main import app
+    from agents.offload import loop_lag
+
+    if args.mode == "http":
+        server, thread = start_server(app, args.port)
+        client = httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=None)
+    else:
+        server = None
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=None)
+        # No lifespan events in-process; the server shares this loop
+        loop_lag.start()
+
+    try:
+        latencies, errors, elapsed = await run_load(
+            client, args.mix, args.rate, args.duration, args.max_in_flight, random.Random(args.seed)
+        )
+        lag = (await client.get("/metrics")).json()["event_loop_lag"]
+    finally:
+        await client.aclose()
+        if server is not None:
+            server.should_exit = True
+            thread.join()
+        else:
+            await loop_lag.stop()
+    return summarize(latencies, errors, elapsed, args.duration), lag
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the SEO Content Generator API with a fake LLM")
+    parser.add_argument("--mode", choices=["inprocess", "http"], default="inprocess")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rate", type=float, default=5.0, help="Mean arrivals per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to keep sending requests")
+    parser.add_argument("--max-in-flight", type=int, default=500)
+    parser.add_argument("--mix", type=parse_mix,
+                        default=parse_mix("generate-plan=1,generate-article=2,evaluate-content=7"))
+    parser.add_argument("--latency-scale", type=float, default=1.0,
+                        help="Multiplier on fake LLM latency (e.g. 0.1 for quick runs)")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--save-baseline", type=Path)
+    parser.add_argument("--compare", type=Path, help="Baseline JSON to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        # Retry jitter and the like still use the global generator
+        random.seed(args.seed)
+    # Background prefetch would add LLM load that the request mix doesn't account for
+    settings.PREFETCH_ENABLED = False
+    install_fake_llm(latency_scale=args.latency_scale, error_rate=args.llm_error_rate,
+                     rng=random.Random(args.seed))
+
+    report, lag = asyncio.run(main_async(args))
+    print_report(report)
+    if lag.get("samples"):
+        print(f"Event loop lag: p50 {lag['p50_ms']:.1f}ms, p99 {lag['p99_ms']:.1f}ms, max {lag['max_ms']:.1f}ms")
+
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Baseline written to {args.save_baseline}")
+    if args.compare:
+        regressions = compare(report, json.loads(args.compare.read_text()), args.tolerance)
+        for regression in regressions:
+            print(f"❌ {regression}")
+        if regressions:
+            sys.exit(1)
+        print("✅ No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List, Optional, Dict
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Literal, Optional, Dict
 from datetime import datetime
 
 class BusinessInput(BaseModel):
@@ -9,12 +9,76 @@ class BusinessInput(BaseModel):
     niche_keywords: List[str]
     content_tone: Optional[str] = "professional"
     preferred_length: Optional[int] = 1500
+    calendar_days: Optional[int] = 7
+    posts_per_week: Optional[int] = 7
+    publish_weekdays: Optional[List[int]] = None  # 0 = Monday ... 6 = Sunday
+    competitor_urls: Optional[List[str]] = None
+
+class CompetitorPage(BaseModel):
+    url: str
+    title: str
+    headings: List[str]
+    word_count: int
+    keyword_counts: Dict[str, int]
+
+class KeywordMetrics(BaseModel):
+    keyword: str
+    search_volume: int
+    competition: float  # 0 (none) - 1 (saturated)
+    competition_level: str
+
+class KeywordTrend(BaseModel):
+    keyword: str
+    volume: int
+    moving_average: float
+    growth: float  # recent weeks vs the weeks before, 0.25 = +25%
+    momentum: float
+    seasonality: float  # year-over-year correlation, -1..1
+    score: float  # growth beyond the seasonal expectation
 
 class MarketResearchResult(BaseModel):
     trending_keywords: List[str]
     competitor_insights: List[Dict[str, str]]
     search_volume_data: Dict[str, int]
     difficulty_scores: Dict[str, float]
+    keyword_metrics: Dict[str, KeywordMetrics] = {}  # measured SERP data only, no estimates
+    keyword_trends: List[KeywordTrend] = []  # rising keywords from the trend store
+
+# Structured LLM outputs (one round trip per agent)
+class CompetitorInsight(BaseModel):
+    insight_type: str = Field(description="One of: strategy, content_gap, keyword_focus")
+    description: str = Field(min_length=1)
+
+class MarketResearchDraft(BaseModel):
+    trending_keywords: List[str] = Field(min_length=1)
+    competitor_insights: List[CompetitorInsight] = Field(min_length=1)
+
+class KeywordStrategyDraft(BaseModel):
+    long_tail_keywords: List[str] = Field(min_length=1)
+    suggested_titles: List[str] = Field(min_length=1)
+    meta_descriptions: List[str] = Field(description="One meta description per suggested title, same order")
+
+    @model_validator(mode="after")
+    def _one_description_per_title(self):
+        if len(self.meta_descriptions) != len(self.suggested_titles):
+            raise ValueError("meta_descriptions must have one entry per suggested title")
+        return self
+
+class TitleSuggestion(BaseModel):
+    title: str = Field(min_length=1)
+    keywords: List[str] = Field(min_length=1, description="Targeted keywords, main keyword first")
+
+class TitleSuggestionBatch(BaseModel):
+    titles: List[TitleSuggestion] = Field(min_length=1)
+
+class ParagraphReview(BaseModel):
+    index: int = Field(description="Number of the paragraph being reviewed")
+    grammar_score: float = Field(ge=0, le=100, description="Grammar, spelling and style quality 0-100")
+    plagiarism_risk: Literal["Low", "Medium", "High"]
+    issues: List[str] = Field(default_factory=list, description="Specific grammar, spelling or style problems")
+
+class ParagraphReviewBatch(BaseModel):
+    reviews: List[ParagraphReview] = Field(description="One review per paragraph")
 
 class ArticleRequest(BaseModel):
     title: str
@@ -44,12 +108,32 @@ class BlogArticle(BaseModel):
     readability_score: float
     seo_score: float
 
+class ChunkReview(BaseModel):
+    index: int
+    word_count: int
+    grammar_score: float
+    plagiarism_risk: str
+    issues: List[str] = []
+
+class ArticleContext(BaseModel):
+    """Plan artifacts that let article agents skip calls whose answers already exist"""
+    meta_descriptions: Dict[str, str] = {}  # by lowercased title
+    keyword_metrics: Dict[str, KeywordMetrics] = {}  # by lowercased keyword
+
 class QualityReport(BaseModel):
     grammar_score: float
     readability_score: float
     keyword_density: Dict[str, float]
     plagiarism_risk: str
     suggestions: List[str]
+    chunk_reviews: List[ChunkReview] = []
+
+class SectionRevision(BaseModel):
+    """Edits one article section needs to resolve quality-report suggestions"""
+    index: int  # position in the article; 0 is the introduction
+    heading: str
+    suggestions: List[str]  # report suggestions this section is responsible for
+    instructions: List[str]  # concrete edits for the writer
 
 class PerformanceEstimate(BaseModel):
     estimated_ranking: int
@@ -57,6 +141,26 @@ class PerformanceEstimate(BaseModel):
     competition_level: str
     success_probability: float
 
+class ArticleRevisionRequest(BaseModel):
+    article: BlogArticle
+    # Reports from an earlier evaluation; recomputed (mostly from cache) when omitted
+    quality_report: Optional[QualityReport] = None
+    performance_estimate: Optional[PerformanceEstimate] = None
+
+class BatchScoreRequest(BaseModel):
+    # Columnar inputs: element i of every list describes article i
+    seo_score: List[float]
+    grammar_score: List[float]
+    readability_score: List[float]
+    keyword_density_sum: List[float]
+    word_count: List[int]
+
+    @model_validator(mode="after")
+    def _equal_lengths(self):
+        if len({len(column) for column in self.model_dump().values()}) > 1:
+            raise ValueError("all columns must have the same length")
+        return self
+
 # ✅ Response Models
 class ArticleResponse(BaseModel):
     article: BlogArticle
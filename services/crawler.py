@@ -0,0 +1,279 @@
+"""Polite async crawler for competitor pages.
+
+Connections are pooled per host by a shared aiohttp connector, requests to
+the same host are spaced by CRAWLER_HOST_DELAY, robots.txt is fetched once
+per host and cached, and pages are revalidated with ETag/Last-Modified so
+unchanged pages are not downloaded again. HTML parsing runs on the shared
+CPU pool so large pages don't block the event loop. Per-host state is kept
+for the CRAWLER_MAX_HOSTS most recently crawled hosts.
+
+URLs come from API clients, so only http(s) URLs whose host resolves to
+public addresses are fetched. The check runs for every redirect hop and, via
+the connector's resolver, for every connection, so DNS answers that change
+between the check and the connect can't reach internal services either.
+Every hop must also be allowed by its own host's robots.txt, and bodies
+larger than CRAWLER_MAX_PAGE_BYTES are not read.
+"""
+import asyncio
+import ipaddress
+import re
+import time
+from collections import OrderedDict
+from itertools import islice
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
+from urllib.parse import urljoin, urlsplit
+from urllib.robotparser import RobotFileParser
+
+import aiohttp
+from bs4 import BeautifulSoup
+
+from agents.offload import run_cpu
+from config.settings import settings
+from models.schemas import CompetitorPage
+
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+
+
+class BlockedURL(ValueError):
+    """Raised for URLs the crawler must not fetch (non-http scheme, non-public host, robots.txt)."""
+
+
+class PageTooLarge(ValueError):
+    """Raised for response bodies over CRAWLER_MAX_PAGE_BYTES."""
+
+
+FETCH_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError, BlockedURL, PageTooLarge)
+
+
+def _check_address(host: str, address: str):
+    if settings.CRAWLER_ALLOW_PRIVATE_HOSTS:
+        return
+    # Zone ids ("fe80::1%eth0") are only ever link-local
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    if not ip.is_global:
+        raise BlockedURL(f"{host} resolves to non-public address {address}")
+
+
+def check_url(url: str):
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise BlockedURL(f"Only http(s) URLs can be crawled: {url}")
+    try:
+        ipaddress.ip_address(parts.hostname)
+    except ValueError:
+        return  # a host name; the connector's resolver checks what it resolves to
+    # IP literals never reach the resolver, so check them here
+    _check_address(parts.hostname, parts.hostname)
+
+
+class _PublicResolver(aiohttp.ThreadedResolver):
+    async def resolve(self, host: str, port: int = 0, family=0):
+        addresses = await super().resolve(host, port, family)
+        for entry in addresses:
+            try:
+                _check_address(host, entry["host"])
+            except BlockedURL as e:
+                # OSError is what the connector reports as a failed connection
+                raise OSError(str(e)) from e
+        return addresses
+
+
+def extract_page(url: str, html: str, keywords: List[str]) -> dict:
+    """Headings, word count and keyword usage of one page (may run on the CPU_POOL thread or process pool)."""
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(["script", "style", "noscript"]):
+        tag.decompose()
+
+    title = soup.title.get_text(strip=True) if soup.title else ""
+    headings = [
+        heading.get_text(" ", strip=True)
+        for heading in soup.find_all(["h1", "h2", "h3"])
+        if heading.get_text(strip=True)
+    ]
+    text = soup.get_text(" ", strip=True)
+    text_lower = text.lower()
+
+    return {
+        "url": url,
+        "title": title,
+        "headings": headings[:settings.CRAWLER_MAX_HEADINGS],
+        "word_count": len(text.split()),
+        "keyword_counts": {
+            kw: len(re.findall(r"\b" + re.escape(kw.lower()) + r"\b", text_lower))
+            for kw in keywords
+        },
+    }
+
+
+class _HostState:
+    """Politeness state of one host."""
+
+    __slots__ = ("lock", "last_request")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.last_request = 0.0
+
+
+class _RobotsState:
+    """Cached robots.txt of one origin; `parser` None means no restrictions."""
+
+    __slots__ = ("lock", "fetched_at", "parser")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.fetched_at: Optional[float] = None
+        self.parser: Optional[RobotFileParser] = None
+
+
+StateT = TypeVar("StateT", _HostState, _RobotsState)
+
+
+def _lru_state(table: "OrderedDict[str, StateT]", key: str, factory: Callable[[], StateT]) -> StateT:
+    state = table.get(key)
+    if state is None:
+        state = table[key] = factory()
+        # Forget the least recently used hosts, except ones a request is using right now
+        excess = len(table) - settings.CRAWLER_MAX_HOSTS
+        for old in list(islice(table, max(excess, 0))):
+            if not table[old].lock.locked():
+                del table[old]
+    table.move_to_end(key)
+    return state
+
+
+async def _read_body(response: aiohttp.ClientResponse) -> str:
+    limit = settings.CRAWLER_MAX_PAGE_BYTES
+    if (response.content_length or 0) > limit:
+        raise PageTooLarge(f"{response.url}: {response.content_length} bytes")
+    # Content-Length can be missing or wrong, so the read itself is bounded too
+    raw = await response.content.read(limit + 1)
+    if len(raw) > limit:
+        raise PageTooLarge(f"{response.url}: over {limit} bytes")
+    try:
+        return raw.decode(response.charset or "utf-8", errors="replace")
+    except LookupError:
+        return raw.decode("utf-8", errors="replace")
+
+
+class CompetitorCrawler:
+    def __init__(self):
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._robots: "OrderedDict[str, _RobotsState]" = OrderedDict()
+        self._hosts: "OrderedDict[str, _HostState]" = OrderedDict()
+        # url -> (validators, html) for conditional re-fetches
+        self._pages: "OrderedDict[str, Tuple[Dict[str, str], str]]" = OrderedDict()
+
+    async def crawl(self, urls: List[str], keywords: List[str]) -> List[CompetitorPage]:
+        """Fetch and summarize pages; failed or disallowed URLs are skipped."""
+        results = await asyncio.gather(
+            *[self._crawl_page(url, keywords) for url in dict.fromkeys(urls)],
+            return_exceptions=True
+        )
+        return [page for page in results if isinstance(page, CompetitorPage)]
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=settings.CRAWLER_MAX_CONNECTIONS,
+                    limit_per_host=settings.CRAWLER_MAX_CONNECTIONS_PER_HOST,
+                    resolver=_PublicResolver()
+                ),
+                timeout=aiohttp.ClientTimeout(total=settings.CRAWLER_TIMEOUT),
+                headers={"User-Agent": settings.CRAWLER_USER_AGENT}
+            )
+        return self._session
+
+    async def _crawl_page(self, url: str, keywords: List[str]) -> Optional[CompetitorPage]:
+        check_url(url)
+        html = await self._fetch(url)
+        if html is None:
+            return None
+        page = await run_cpu(extract_page, url, html, keywords, size=len(html))
+        return CompetitorPage(**page)
+
+    async def _allowed(self, url: str) -> bool:
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        robots = _lru_state(self._robots, origin, _RobotsState)
+        async with robots.lock:
+            if robots.fetched_at is None or time.monotonic() - robots.fetched_at > settings.CRAWLER_ROBOTS_TTL:
+                robots.parser = await self._fetch_robots(origin)
+                robots.fetched_at = time.monotonic()
+        return robots.parser is None or robots.parser.can_fetch(settings.CRAWLER_USER_AGENT, url)
+
+    async def _fetch_robots(self, origin: str) -> Optional[RobotFileParser]:
+        # None means "no restrictions" (missing robots.txt or unreachable)
+        try:
+            status, _, body = await self._get(f"{origin}/robots.txt", robots=False)
+        except FETCH_ERRORS:
+            return None
+        parser = RobotFileParser()
+        if status in (401, 403):
+            # Same as RobotFileParser.read(): an access-controlled robots.txt forbids everything
+            parser.disallow_all = True
+        elif status >= 400:
+            return None
+        else:
+            parser.parse(body.splitlines())
+        return parser
+
+    async def _fetch(self, url: str) -> Optional[str]:
+        cached = self._pages.get(url)
+        headers = cached[0] if cached else {}
+        try:
+            status, response_headers, html = await self._get(url, headers)
+        except FETCH_ERRORS:
+            return None
+        if status == 304 and cached:
+            self._pages.move_to_end(url)
+            return cached[1]
+        if status != 200:
+            return None
+        validators = {}
+        if "ETag" in response_headers:
+            validators["If-None-Match"] = response_headers["ETag"]
+        if "Last-Modified" in response_headers:
+            validators["If-Modified-Since"] = response_headers["Last-Modified"]
+
+        if validators:
+            self._pages[url] = (validators, html)
+            self._pages.move_to_end(url)
+            if len(self._pages) > settings.CRAWLER_PAGE_CACHE_SIZE:
+                self._pages.popitem(last=False)
+        return html
+
+    async def _get(self, url: str, headers: Optional[Dict[str, str]] = None, robots: bool = True):
+        """GET `url` as (status, headers, body), checking every redirect hop before following it."""
+        for _ in range(settings.CRAWLER_MAX_REDIRECTS + 1):
+            check_url(url)
+            # A redirect can lead to another host, whose own robots.txt applies
+            if robots and not await self._allowed(url):
+                raise BlockedURL(f"Disallowed by robots.txt: {url}")
+            await self._wait_for_host(url)
+            async with self._get_session().get(url, headers=headers, allow_redirects=False) as response:
+                if response.status in REDIRECT_STATUSES and "Location" in response.headers:
+                    url = urljoin(url, response.headers["Location"])
+                    headers = None  # validators belong to the original URL
+                    continue
+                body = await _read_body(response) if response.status == 200 else ""
+                return response.status, response.headers, body
+        raise BlockedURL(f"Too many redirects: {url}")
+
+    async def _wait_for_host(self, url: str):
+        # Politeness: at most one request per CRAWLER_HOST_DELAY to any host
+        host = _lru_state(self._hosts, urlsplit(url).netloc, _HostState)
+        async with host.lock:
+            wait = host.last_request + settings.CRAWLER_HOST_DELAY - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            host.last_request = time.monotonic()
+
+
+competitor_crawler = CompetitorCrawler()
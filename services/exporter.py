@@ -0,0 +1,204 @@
+"""Render articles through Jinja2 templates and stream them as ZIP or NDJSON.
+
+Templates are compiled once when the exporter is created and reused for
+every article. Archives are produced one article at a time: each rendered
+file is written to the ZIP (or NDJSON) stream and the bytes are handed to
+the caller immediately, so memory holds one article at a time (plus the
+ZIP's small per-file index) however many articles are exported.
+
+Article content is untrusted (POST /export takes it from the client), so the
+markdown filter escapes raw HTML instead of passing it through and drops
+links and images with non-web URL schemes.
+"""
+import re
+import zipfile
+from datetime import date
+from typing import AsyncIterator, Dict, Iterable, List, NamedTuple, Optional, Set
+from urllib.parse import urlsplit
+
+import markdown
+import orjson
+from markdown.extensions import Extension
+from markdown.treeprocessors import Treeprocessor
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from markupsafe import Markup
+from pydantic import ValidationError
+
+from config.settings import settings
+from models.schemas import BlogArticle
+
+EXPORT_TEMPLATES = {
+    "html": ("article.html.j2", ".html"),
+    "markdown": ("article.md.j2", ".md"),
+}
+
+
+SAFE_URL_SCHEMES = ("", "http", "https", "mailto")
+
+
+class _DropUnsafeUrls(Treeprocessor):
+    def run(self, root):
+        for element in root.iter():
+            for attribute in ("href", "src"):
+                url = element.get(attribute)
+                # Browsers ignore whitespace and control characters inside the scheme
+                if url is not None and urlsplit("".join(url.split())).scheme.lower() not in SAFE_URL_SCHEMES:
+                    del element.attrib[attribute]
+
+
+class _SafeMarkdown(Extension):
+    """Render raw HTML as text and keep only web/mail URLs."""
+
+    def extendMarkdown(self, md):
+        md.preprocessors.deregister("html_block")
+        md.inlinePatterns.deregister("html")
+        md.treeprocessors.register(_DropUnsafeUrls(md), "drop_unsafe_urls", 0)
+
+
+class ExportRecord(NamedTuple):
+    label: str
+    article: Optional[BlogArticle] = None
+    scheduled_date: Optional[str] = None
+    error: Optional[str] = None  # set when this record could not be produced
+
+
+def slugify(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")[:80] or "article"
+
+
+def schema_markup(article: BlogArticle, scheduled_date: Optional[str] = None) -> Dict:
+    """schema.org BlogPosting JSON-LD for an article."""
+    markup = {
+        "@context": "https://schema.org",
+        "@type": "BlogPosting",
+        "headline": article.title,
+        "description": article.meta_description,
+        "keywords": ", ".join(article.keywords),
+        "wordCount": article.word_count,
+    }
+    if scheduled_date:
+        markup["datePublished"] = scheduled_date
+    return markup
+
+
+async def records_from_ndjson(lines: Iterable[bytes]) -> AsyncIterator[ExportRecord]:
+    """BlogArticle objects, one per line, each optionally with a "scheduled_date"."""
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        label = f"line {line_number}"
+        try:
+            data = orjson.loads(line)
+            if not isinstance(data, dict):
+                raise ValueError("Expected a JSON object")
+            scheduled_date = data.pop("scheduled_date", None)
+            if scheduled_date is not None:
+                # It becomes part of the file name; anything but a date is rejected
+                scheduled_date = date.fromisoformat(str(scheduled_date)).isoformat()
+            yield ExportRecord(label, BlogArticle.model_validate(data), scheduled_date)
+        except ValidationError as e:
+            yield ExportRecord(label, error="; ".join(
+                f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in e.errors()
+            ))
+        except ValueError as e:
+            yield ExportRecord(label, error=str(e))
+
+
+class _ChunkBuffer:
+    """Write-only sink for zipfile; collected bytes are drained after each entry."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ArticleExporter:
+    def __init__(self, template_dir: str = settings.EXPORT_TEMPLATE_DIR):
+        self.env = Environment(
+            loader=FileSystemLoader(template_dir),
+            autoescape=select_autoescape(enabled_extensions=("html.j2",), default_for_string=False),
+            auto_reload=False,
+            trim_blocks=True,
+            lstrip_blocks=True,
+            keep_trailing_newline=True,
+        )
+        self._markdown = markdown.Markdown(extensions=["extra", "sane_lists", _SafeMarkdown()])
+        self.env.filters["markdown"] = self._render_markdown
+        # Compile every template up front; rendering only runs the compiled code
+        self.templates = {
+            name: (self.env.get_template(filename), extension)
+            for name, (filename, extension) in EXPORT_TEMPLATES.items()
+        }
+
+    def _render_markdown(self, text: str) -> Markup:
+        html = self._markdown.reset().convert(text)
+        return Markup(html)
+
+    def render(self, article: BlogArticle, template: str = "html",
+               scheduled_date: Optional[str] = None) -> str:
+        compiled, _ = self.templates[template]
+        return compiled.render(
+            article=article,
+            scheduled_date=scheduled_date,
+            schema_markup=schema_markup(article, scheduled_date),
+        )
+
+    def filename(self, record: ExportRecord, template: str, used: Set[str]) -> str:
+        _, extension = self.templates[template]
+        stem = slugify(record.article.title)
+        if record.scheduled_date:
+            stem = f"{slugify(record.scheduled_date)}-{stem}"
+        name, counter = f"{stem}{extension}", 2
+        while name in used:
+            name, counter = f"{stem}-{counter}{extension}", counter + 1
+        used.add(name)
+        return name
+
+    async def stream_ndjson(self, records: AsyncIterator[ExportRecord],
+                            template: str = "html") -> AsyncIterator[bytes]:
+        used: Set[str] = set()
+        async for record in records:
+            if record.error is not None:
+                line = {"label": record.label, "error": record.error}
+            else:
+                line = {
+                    "filename": self.filename(record, template, used),
+                    "title": record.article.title,
+                    "scheduled_date": record.scheduled_date,
+                    "schema_markup": schema_markup(record.article, record.scheduled_date),
+                    "rendered": self.render(record.article, template, record.scheduled_date),
+                }
+            yield orjson.dumps(line) + b"\n"
+
+    async def stream_zip(self, records: AsyncIterator[ExportRecord],
+                         template: str = "html") -> AsyncIterator[bytes]:
+        used: Set[str] = set()
+        errors: List[str] = []
+        buffer = _ChunkBuffer()
+        # An unseekable sink makes zipfile write data descriptors instead of seeking back
+        with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            async for record in records:
+                if record.error is not None:
+                    errors.append(f"{record.label}: {record.error}")
+                    continue
+                rendered = self.render(record.article, template, record.scheduled_date)
+                archive.writestr(self.filename(record, template, used), rendered)
+                yield buffer.drain()
+            if errors:
+                archive.writestr("errors.txt", "\n".join(errors) + "\n")
+        # Central directory, written when the archive is closed
+        yield buffer.drain()
+
+
+article_exporter = ArticleExporter()
@@ -0,0 +1,68 @@
+"""Local stand-in for the SERP keyword-metrics API.
+
+Returns deterministic metrics derived from a hash of each keyword after a
+simulated latency, so the SerpClient can be developed and benchmarked
+offline:
+
+    python -m services.mock_serp_server --port 8100 --latency 0.2
+
+then set SERP_API_URL=http://localhost:8100 and any SERP_API_KEY.
+"""
+import argparse
+import asyncio
+import hashlib
+import random
+from typing import List
+
+import uvicorn
+from fastapi import FastAPI, Header, HTTPException
+from pydantic import BaseModel
+
+app = FastAPI(title="Mock SERP API")
+app.state.latency = 0.2
+app.state.jitter = 0.1
+app.state.requests = 0
+app.state.keywords = 0
+
+
+class KeywordsRequest(BaseModel):
+    keywords: List[str]
+
+
+def _metrics(keyword: str) -> dict:
+    digest = hashlib.sha1(keyword.strip().lower().encode("utf-8")).digest()
+    # Longer (long-tail) keywords get lower volume and competition
+    words = max(len(keyword.split()), 1)
+    volume = int.from_bytes(digest[:4], "big") % 50000 // words + 10
+    competition = round((digest[4] / 255) / (1 + 0.2 * (words - 1)), 2)
+    return {"keyword": keyword, "search_volume": volume, "competition": competition}
+
+
+@app.post("/keywords")
+async def keywords(request: KeywordsRequest, x_api_key: str = Header(None)):
+    if not x_api_key:
+        raise HTTPException(status_code=401, detail="Missing X-API-Key")
+    app.state.requests += 1
+    app.state.keywords += len(request.keywords)
+    await asyncio.sleep(max(0.0, random.gauss(app.state.latency, app.state.jitter)))
+    return {"results": [_metrics(keyword) for keyword in request.keywords]}
+
+
+@app.get("/stats")
+async def stats():
+    return {"requests": app.state.requests, "keywords": app.state.keywords}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the mock SERP API")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", type=float, default=0.2, help="Mean response latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.1, help="Latency std deviation (s)")
+    args = parser.parse_args()
+    app.state.latency = args.latency
+    app.state.jitter = args.jitter
+    uvicorn.run(app, host="127.0.0.1", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""Async SERP keyword-metrics client.
+
+Lookups for individual keywords are coalesced into batched requests, a
+keyword already being fetched is awaited rather than requested twice, and
+results are cached on disk for SERP_CACHE_TTL seconds. Recently used entries
+are also kept in memory; disk reads and writes run in a worker thread so
+they never block the event loop.
+
+Provider contract (implemented by services/mock_serp_server.py):
+    POST {SERP_API_URL}/keywords   headers: X-API-Key
+    {"keywords": ["..."]}  ->  {"results": [{"keyword", "search_volume", "competition"}]}
+"""
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import aiohttp
+
+from config.settings import settings
+from models.schemas import KeywordMetrics
+
+
+def competition_level(competition: float) -> str:
+    if competition < 0.33:
+        return "Low"
+    if competition < 0.66:
+        return "Medium"
+    return "High"
+
+
+class SerpClient:
+    def __init__(self, base_url: Optional[str] = None, api_key: Optional[str] = None,
+                 cache_dir: Optional[str] = None):
+        self.base_url = (base_url or settings.SERP_API_URL or "").rstrip("/")
+        self.api_key = api_key or settings.SERP_API_KEY
+        self.cache_dir = Path(cache_dir or settings.SERP_CACHE_DIR)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._pending: List[str] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._batches: Set[asyncio.Task] = set()
+        # keyword -> (fetched_at, metrics), most recently used last
+        self._memory: "OrderedDict[str, Tuple[float, KeywordMetrics]]" = OrderedDict()
+        self.stats = {"lookups": 0, "cache_hits": 0, "deduplicated": 0, "requests": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.base_url and self.api_key)
+
+    async def lookup(self, keywords: List[str]) -> Dict[str, KeywordMetrics]:
+        """Metrics for each keyword; keywords the provider could not answer are omitted."""
+        normalized = {kw: kw.strip().lower() for kw in keywords}
+        unique = set(normalized.values())
+        cache = {keyword: self._memory_get(keyword) for keyword in unique}
+        misses = [keyword for keyword, metrics in cache.items() if metrics is None]
+        if misses:
+            loop = asyncio.get_running_loop()
+            for keyword, entry in (await loop.run_in_executor(None, self._read_cache, misses)).items():
+                self._memory_put(keyword, *entry)
+                cache[keyword] = entry[1]
+        
+        waits = {}
+        for keyword in unique:
+            self.stats["lookups"] += 1
+            cached = cache[keyword]
+            if cached is not None:
+                self.stats["cache_hits"] += 1
+                waits[keyword] = cached
+            elif keyword in self._in_flight:
+                self.stats["deduplicated"] += 1
+                waits[keyword] = self._in_flight[keyword]
+            else:
+                waits[keyword] = self._enqueue(keyword)
+
+        results = {}
+        for keyword, wait in waits.items():
+            try:
+                # Shielded: a cancelled caller must not cancel a batch other requests share
+                results[keyword] = wait if isinstance(wait, KeywordMetrics) else await asyncio.shield(wait)
+            except Exception:
+                # Provider errors degrade to "no data" for that keyword
+                continue
+        return {kw: results[norm] for kw, norm in normalized.items() if norm in results}
+
+    async def close(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        for task in self._batches:
+            task.cancel()
+        await asyncio.gather(*self._batches, return_exceptions=True)
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _enqueue(self, keyword: str) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._in_flight[keyword] = future
+        self._pending.append(keyword)
+        if len(self._pending) >= settings.SERP_BATCH_SIZE:
+            self._flush()
+        elif self._flush_handle is None:
+            # Give concurrent callers a short window to join the same batch
+            self._flush_handle = loop.call_later(settings.SERP_BATCH_WINDOW, self._flush)
+        return future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            # Keep a reference so the batch isn't garbage-collected mid-flight
+            task = asyncio.ensure_future(self._fetch_batch(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _fetch_batch(self, batch: List[str]):
+        self.stats["requests"] += 1
+        try:
+            async with self._get_session().post(
+                f"{self.base_url}/keywords",
+                json={"keywords": batch},
+                headers={"X-API-Key": self.api_key}
+            ) as response:
+                response.raise_for_status()
+                payload = await response.json()
+            found = {}
+            fetched_at = time.time()
+            for item in payload.get("results", []):
+                keyword = item["keyword"].strip().lower()
+                found[keyword] = KeywordMetrics(
+                    keyword=keyword,
+                    search_volume=item["search_volume"],
+                    competition=item["competition"],
+                    competition_level=competition_level(item["competition"])
+                )
+                self._memory_put(keyword, fetched_at, found[keyword])
+            for keyword in batch:
+                future = self._in_flight.pop(keyword)
+                if keyword in found:
+                    future.set_result(found[keyword])
+                else:
+                    future.set_exception(KeyError(keyword))
+        except asyncio.CancelledError:
+            for keyword in batch:
+                future = self._in_flight.pop(keyword, None)
+                if future is not None:
+                    future.cancel()
+            raise
+        except Exception as e:
+            for keyword in batch:
+                future = self._in_flight.pop(keyword, None)
+                if future is not None and not future.done():
+                    future.set_exception(e)
+            return
+        # Waiters already have their results; persisting them can happen off the loop
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, self._write_cache, found.values(), fetched_at)
+        except OSError:
+            pass  # the disk cache is an optimization
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=settings.SERP_TIMEOUT)
+            )
+        return self._session
+
+    def _cache_path(self, keyword: str) -> Path:
+        return self.cache_dir / f"{hashlib.sha1(keyword.encode('utf-8')).hexdigest()}.json"
+
+    def _memory_get(self, keyword: str) -> Optional[KeywordMetrics]:
+        entry = self._memory.get(keyword)
+        if entry is None:
+            return None
+        if time.time() - entry[0] > settings.SERP_CACHE_TTL:
+            del self._memory[keyword]
+            return None
+        self._memory.move_to_end(keyword)
+        return entry[1]
+
+    def _memory_put(self, keyword: str, fetched_at: float, metrics: KeywordMetrics):
+        self._memory[keyword] = (fetched_at, metrics)
+        self._memory.move_to_end(keyword)
+        if len(self._memory) > settings.SERP_MEMORY_CACHE_SIZE:
+            self._memory.popitem(last=False)
+
+    def _read_cache(self, keywords: List[str]) -> Dict[str, Tuple[float, KeywordMetrics]]:
+        # Runs in a worker thread
+        entries = {}
+        for keyword in keywords:
+            try:
+                entry = json.loads(self._cache_path(keyword).read_text())
+            except (OSError, ValueError):
+                continue
+            if time.time() - entry["fetched_at"] <= settings.SERP_CACHE_TTL:
+                entries[keyword] = (entry["fetched_at"], KeywordMetrics(**entry["metrics"]))
+        return entries
+
+    def _write_cache(self, metrics: Iterable[KeywordMetrics], fetched_at: float):
+        # Runs in a worker thread
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        for item in metrics:
+            path = self._cache_path(item.keyword)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps({"fetched_at": fetched_at, "metrics": item.model_dump()}))
+            tmp.replace(path)
+
+
+serp_client = SerpClient()
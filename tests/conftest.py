@@ -0,0 +1,8 @@
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Agents build their LLM clients lazily; the fake model never uses the key
+os.environ.setdefault("OPENAI_API_KEY", "test")
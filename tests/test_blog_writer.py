@@ -0,0 +1,85 @@
+import asyncio
+
+from agents import base_agent
+from agents.blog_writer_agent import BlogWriterAgent
+from agents.llm_resilience import llm_stats
+from loadtest.fake_llm import install_fake_llm
+from models.schemas import BlogArticle, BusinessInput, SectionRevision
+from workflow.seo_workflow import SEOWorkflow
+
+
+def _avoided():
+    return llm_stats.snapshot().get("BlogWriter.meta_description", {}).get("avoided", 0)
+
+
+def test_avoided_counts_only_saved_meta_calls():
+    install_fake_llm(latency_scale=0.01)
+    writer = BlogWriterAgent()
+
+    before = _avoided()
+    article = asyncio.run(writer.execute("Avoided test", ["crm"], meta_description="From the plan"))
+    assert _avoided() == before + 1
+
+    # Revising never asks for a meta description, so nothing was avoided
+    revision = SectionRevision(index=0, heading="", suggestions=["s"], instructions=["Shorten it"])
+    revised = asyncio.run(writer.revise(article, [revision]))
+    assert _avoided() == before + 1
+    assert revised.meta_description == "From the plan"
+
+
+def test_calendar_articles_reuse_plan_meta_descriptions():
+    install_fake_llm(latency_scale=0.01)
+    workflow = SEOWorkflow()
+
+    async def run():
+        plan = await workflow.generate_complete_plan(BusinessInput(
+            business_type="SaaS", product_service="crm", target_audience="smb",
+            niche_keywords=["crm"], calendar_days=7, posts_per_week=3
+        ))
+        before = llm_stats.snapshot().get("BlogWriter.meta_description", {}).get("attempts", 0)
+        articles = await workflow.generate_calendar_articles(plan)
+        after = llm_stats.snapshot().get("BlogWriter.meta_description", {}).get("attempts", 0)
+        return plan, articles, after - before
+
+    plan, articles, meta_calls = asyncio.run(run())
+
+    schedule = plan["plan"]["content_schedule"]
+    assert [article["scheduled_date"] for article in articles] == [entry["date"] for entry in schedule]
+    assert meta_calls == 0
+
+
+def test_stream_releases_llm_slot_while_consumer_works(monkeypatch):
+    install_fake_llm(latency_scale=0.01)
+    writer = BlogWriterAgent()
+
+    async def run():
+        slots = asyncio.Semaphore(1)
+        monkeypatch.setattr(base_agent, "_llm_slots", slots)
+        pieces = []
+        async for piece in writer._stream_llm("Write a meta description.", "Slot test", task="meta_description"):
+            pieces.append(piece)
+            if len(pieces) == 1:
+                # The consumer is busy; the finished response must not keep its slot
+                await asyncio.sleep(0.2)
+                assert not slots.locked()
+        return pieces
+
+    assert len(asyncio.run(run())) > 1
+
+
+def test_failed_section_review_does_not_fail_the_article(monkeypatch, caplog):
+    install_fake_llm(latency_scale=0.01)
+    workflow = SEOWorkflow()
+    reviewed = []
+
+    async def review_section(section, keywords):
+        reviewed.append(section)
+        if len(reviewed) == 1:
+            raise asyncio.TimeoutError("Simulated provider timeout")
+
+    monkeypatch.setattr(workflow.quality_reviewer_agent, "review_section", review_section)
+    result = asyncio.run(workflow.generate_article("Pipeline failure test", ["crm"], pipelined=True))
+
+    assert len(reviewed) > 1
+    assert result["quality_report"]["chunk_reviews"]
+    assert "Early review of section 1" in caplog.text
@@ -0,0 +1,58 @@
+import json
+
+from bulk_generate import compact_output, load_completed, read_records
+
+
+def _line(record_id, success=True):
+    return json.dumps({"id": record_id, "success": success}) + "\n"
+
+
+def test_partial_last_line_is_truncated(tmp_path):
+    output = tmp_path / "plans.jsonl"
+    output.write_text(_line("a") + _line("b") + '{"id": "c", "succ')
+
+    assert load_completed(output) == {"a", "b"}
+    assert output.read_text() == _line("a") + _line("b")
+
+
+def test_corrupt_middle_line_keeps_later_results(tmp_path):
+    output = tmp_path / "plans.jsonl"
+    content = _line("a") + "not json\n" + _line("b") + _line("c", success=False)
+    output.write_text(content)
+
+    assert load_completed(output) == {"a", "b"}
+    assert output.read_text() == content
+
+
+def test_unterminated_last_record_gets_its_newline(tmp_path):
+    output = tmp_path / "plans.jsonl"
+    output.write_text(_line("a") + _line("b").rstrip("\n"))
+
+    assert load_completed(output) == {"a", "b"}
+    assert output.read_text() == _line("a") + _line("b")
+
+
+def test_record_without_id_is_skipped(tmp_path, capsys):
+    output = tmp_path / "plans.jsonl"
+    output.write_text(_line("a") + json.dumps({"success": True}) + "\n")
+
+    assert load_completed(output) == {"a"}
+    assert "line 2" in capsys.readouterr().out
+
+
+def test_compaction_keeps_last_record_per_id(tmp_path):
+    output = tmp_path / "plans.jsonl"
+    output.write_text(_line("a", success=False) + _line("b") + "not json\n" + _line("a"))
+
+    compact_output(output)
+
+    assert output.read_text() == _line("b") + "not json\n" + _line("a")
+
+
+def test_invalid_input_ids_are_reported(tmp_path, capsys):
+    businesses = tmp_path / "businesses.jsonl"
+    businesses.write_text('{"id": 7}\n{"id": null}\n[1, 2]\nnot json\n')
+
+    assert [record_id for record_id, _ in read_records(businesses)] == ["7", "line-2", "line-3", "line-4"]
+    out = capsys.readouterr().out
+    assert "Line 2" in out and "Line 3" in out and "Line 4" in out
@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+
+from agents.content_planner_agent import ContentPlannerAgent
+from config.settings import settings
+from models.schemas import SEOStrategy, TitleSuggestion, TitleSuggestionBatch
+
+STRATEGY = SEOStrategy(
+    primary_keywords=["crm"], long_tail_keywords=["crm for startups"],
+    suggested_titles=[], meta_descriptions=[], internal_links=[]
+)
+
+
+def test_failed_title_batch_is_skipped_and_empty_keywords_dropped(monkeypatch):
+    monkeypatch.setattr(settings, "CALENDAR_TITLE_BATCH_SIZE", 2)
+    planner = ContentPlannerAgent()
+
+    async def suggest(keywords, count, batch_number):
+        if batch_number == 0:
+            raise ValueError("No JSON object found in response")
+        return TitleSuggestionBatch(titles=[
+            TitleSuggestion(title="Choosing a CRM", keywords=["", " ", "crm for startups"]),
+            TitleSuggestion(title="CRM basics", keywords=[""]),
+        ])
+
+    monkeypatch.setattr(planner, "_suggest_title_batch", suggest)
+    titles = asyncio.run(planner._request_more_titles(STRATEGY, [], 4))
+
+    assert titles == [("Choosing a CRM", ["crm for startups"]), ("CRM basics", ["crm"])]
+
+
+def test_unexpected_title_batch_error_propagates(monkeypatch):
+    planner = ContentPlannerAgent()
+
+    async def suggest(keywords, count, batch_number):
+        raise RuntimeError("bug")
+
+    monkeypatch.setattr(planner, "_suggest_title_batch", suggest)
+    with pytest.raises(RuntimeError):
+        asyncio.run(planner._request_more_titles(STRATEGY, [], 2))
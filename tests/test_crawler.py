@@ -0,0 +1,162 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+
+from config.settings import settings
+from services.crawler import BlockedURL, CompetitorCrawler, _PublicResolver, check_url
+
+
+@pytest.mark.parametrize("url", [
+    "file:///etc/passwd",
+    "ftp://example.com/page",
+    "http://127.0.0.1:8000/metrics",
+    "http://10.0.0.5/",
+    "http://192.168.1.1/",
+    "http://169.254.169.254/latest/meta-data/",
+    "http://[::1]/",
+])
+def test_unsafe_urls_are_blocked(url):
+    with pytest.raises(BlockedURL):
+        check_url(url)
+
+
+def test_public_urls_pass():
+    check_url("https://example.com/blog/post")
+    check_url("http://93.184.215.14/")
+
+
+def test_resolver_rejects_names_for_private_addresses():
+    async def resolve():
+        await _PublicResolver().resolve("localhost", 80)
+
+    with pytest.raises(OSError):
+        asyncio.run(resolve())
+
+
+async def _serve(routes):
+    app = web.Application()
+    app.add_routes(routes)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def _crawl(routes, path):
+    async def run():
+        runner, base = await _serve(routes)
+        crawler = CompetitorCrawler()
+        try:
+            return await crawler.crawl([f"{base}{path}"], ["shoes"])
+        finally:
+            await crawler.close()
+            await runner.cleanup()
+
+    return asyncio.run(run())
+
+
+async def _page(request):
+    return web.Response(text="<html><title>Shoes</title><h1>Shoes</h1>shoes</html>", content_type="text/html")
+
+
+def test_local_fixture_server_needs_opt_in(monkeypatch):
+    monkeypatch.setattr(settings, "CRAWLER_HOST_DELAY", 0)
+    routes = [web.get("/page", _page)]
+    assert _crawl(routes, "/page") == []
+
+    monkeypatch.setattr(settings, "CRAWLER_ALLOW_PRIVATE_HOSTS", True)
+    pages = _crawl(routes, "/page")
+    assert [page.title for page in pages] == ["Shoes"]
+
+
+def test_forbidden_robots_txt_disallows_everything(monkeypatch):
+    monkeypatch.setattr(settings, "CRAWLER_HOST_DELAY", 0)
+    monkeypatch.setattr(settings, "CRAWLER_ALLOW_PRIVATE_HOSTS", True)
+
+    async def robots(request):
+        return web.Response(status=403)
+
+    assert _crawl([web.get("/robots.txt", robots), web.get("/page", _page)], "/page") == []
+
+
+def test_redirects_are_checked_hop_by_hop(monkeypatch):
+    monkeypatch.setattr(settings, "CRAWLER_HOST_DELAY", 0)
+    monkeypatch.setattr(settings, "CRAWLER_ALLOW_PRIVATE_HOSTS", True)
+
+    async def redirect(request):
+        raise web.HTTPFound("file:///etc/passwd")
+
+    async def run():
+        runner, base = await _serve([web.get("/page", redirect)])
+        crawler = CompetitorCrawler()
+        try:
+            await crawler._get(f"{base}/page")
+        finally:
+            await crawler.close()
+            await runner.cleanup()
+
+    with pytest.raises(BlockedURL):
+        asyncio.run(run())
+
+
+def test_oversized_pages_are_skipped(monkeypatch):
+    monkeypatch.setattr(settings, "CRAWLER_HOST_DELAY", 0)
+    monkeypatch.setattr(settings, "CRAWLER_ALLOW_PRIVATE_HOSTS", True)
+    monkeypatch.setattr(settings, "CRAWLER_MAX_PAGE_BYTES", 1000)
+
+    async def streamed(request):
+        # Chunked, so there is no Content-Length to reject it up front
+        response = web.StreamResponse(headers={"Content-Type": "text/html"})
+        await response.prepare(request)
+        for _ in range(10):
+            await response.write(b"<p>shoes</p>" * 50)
+        return response
+
+    async def declared(request):
+        return web.Response(text="shoes " * 1000, content_type="text/html")
+
+    routes = [web.get("/streamed", streamed), web.get("/declared", declared), web.get("/page", _page)]
+    assert _crawl(routes, "/streamed") == []
+    assert _crawl(routes, "/declared") == []
+    assert len(_crawl(routes, "/page")) == 1
+
+
+def test_redirect_target_robots_txt_is_honoured(monkeypatch):
+    monkeypatch.setattr(settings, "CRAWLER_HOST_DELAY", 0)
+    monkeypatch.setattr(settings, "CRAWLER_ALLOW_PRIVATE_HOSTS", True)
+
+    async def robots(request):
+        return web.Response(text="User-agent: *\nDisallow: /\n")
+
+    async def run():
+        target, target_base = await _serve([web.get("/robots.txt", robots), web.get("/page", _page)])
+
+        async def redirect(request):
+            raise web.HTTPFound(f"{target_base}/page")
+
+        origin, base = await _serve([web.get("/page", redirect)])
+        crawler = CompetitorCrawler()
+        try:
+            return await crawler.crawl([f"{base}/page"], ["shoes"])
+        finally:
+            await crawler.close()
+            await origin.cleanup()
+            await target.cleanup()
+
+    assert asyncio.run(run()) == []
+
+
+def test_host_state_is_bounded(monkeypatch):
+    monkeypatch.setattr(settings, "CRAWLER_HOST_DELAY", 0)
+    monkeypatch.setattr(settings, "CRAWLER_MAX_HOSTS", 2)
+    crawler = CompetitorCrawler()
+
+    async def visit():
+        for host in ("a.example", "b.example", "c.example"):
+            await crawler._wait_for_host(f"https://{host}/")
+
+    asyncio.run(visit())
+    assert list(crawler._hosts) == ["b.example", "c.example"]
@@ -0,0 +1,100 @@
+import asyncio
+import io
+import zipfile
+
+import httpx
+import orjson
+
+from agents.llm_resilience import llm_stats
+from loadtest.fake_llm import install_fake_llm
+from services.exporter import article_exporter, records_from_ndjson
+from models.schemas import BlogArticle
+
+BUSINESS = {
+    "business_type": "SaaS", "product_service": "crm", "target_audience": "smb",
+    "niche_keywords": ["crm"], "calendar_days": 7, "posts_per_week": 3,
+}
+
+
+def _calls():
+    return llm_stats.snapshot()["total"]["attempts"]
+
+
+def _lines(response):
+    return [orjson.loads(line) for line in response.content.splitlines()]
+
+
+def test_plan_export_generates_only_on_post():
+    install_fake_llm(latency_scale=0.01)
+    from api.main import app, article_store
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=None) as client:
+            created = (await client.post("/generate-plan", json=BUSINESS)).json()
+            plan_id, schedule = created["plan_id"], created["data"]["plan"]["content_schedule"]
+
+            # One article was written ahead of time (e.g. prefetched)
+            first = schedule[0]
+            article = BlogArticle(
+                title=first["title"], meta_description="Ready", content="## Ready\n\nAlready written.",
+                keywords=first["keywords"].split(", "), word_count=3, readability_score=70, seo_score=50
+            )
+            key = article_store.key(first["title"], article.keywords)
+            article_store.add(key, {"article": article.model_dump()})
+
+            before = _calls()
+            get = await client.get(f"/plans/{plan_id}/export", params={"format": "ndjson"})
+            get_calls = _calls() - before
+
+            post = await client.post(f"/plans/{plan_id}/export", params={"format": "ndjson", "max_generate": 1})
+            # What the POST wrote is kept: exporting again doesn't pay for it twice
+            before = _calls()
+            again = await client.get(f"/plans/{plan_id}/export", params={"format": "ndjson"})
+            again_calls = _calls() - before
+            too_many = await client.post(f"/plans/{plan_id}/export", params={"max_generate": 10 ** 6})
+            return schedule, get, get_calls, post, again, again_calls, too_many
+
+    schedule, get, get_calls, post, again, again_calls, too_many = asyncio.run(run())
+
+    assert get_calls == 0
+    lines = _lines(get)
+    assert lines[0]["title"] == schedule[0]["title"]
+    assert all("Not written yet" in line["error"] for line in lines[1:])
+
+    lines = _lines(post)
+    assert "rendered" in lines[0] and "rendered" in lines[1]
+    assert all("error" in line for line in lines[2:])
+    assert again_calls == 0
+    assert [line.get("rendered") is not None for line in _lines(again)][:3] == [True, True, False]
+    assert too_many.status_code == 422
+
+
+def test_markdown_filter_escapes_raw_html():
+    article = BlogArticle(
+        title="Unsafe", meta_description="x", keywords=["x"], word_count=5, readability_score=70, seo_score=50,
+        content="## Intro\n\n<script>alert(1)</script>\n\nSee [this](javascript:alert(1)) and [that](https://example.com).",
+    )
+    html = article_exporter.render(article, "html")
+
+    assert "<script>alert(1)</script>" not in html
+    assert "&lt;script&gt;alert(1)&lt;/script&gt;" in html
+    assert "javascript:" not in html
+    assert 'href="https://example.com"' in html
+
+
+def test_scheduled_date_cannot_escape_the_archive():
+    article = {"title": "T", "meta_description": "x", "content": "Body", "keywords": ["x"],
+               "word_count": 1, "readability_score": 70, "seo_score": 50}
+    lines = [
+        orjson.dumps({**article, "scheduled_date": "../../../etc/cron.d/x"}),
+        orjson.dumps({**article, "scheduled_date": "2024-03-01"}),
+    ]
+
+    async def run():
+        return b"".join([chunk async for chunk in article_exporter.stream_zip(records_from_ndjson(lines))])
+
+    archive = zipfile.ZipFile(io.BytesIO(asyncio.run(run())))
+
+    assert archive.namelist() == ["2024-03-01-t.html", "errors.txt"]
+    assert "line 1" in archive.read("errors.txt").decode()
@@ -0,0 +1,34 @@
+import asyncio
+import json
+import random
+
+from agents.base_agent import LLMRoute
+from loadtest.fake_llm import SCHEMA_MARKER, FakeChatModel, FakeMessage
+from loadtest.run import compare
+from models.schemas import ParagraphReviewBatch, TitleSuggestionBatch
+
+
+def _respond(schema, user_prompt):
+    model = FakeChatModel(LLMRoute("m", 100, 0.0), 0.5, 0.4, 60.0, 0.0, 0.0, random.Random(1))
+    system_prompt = SCHEMA_MARKER + json.dumps(schema.model_json_schema())
+    reply = asyncio.run(model.ainvoke([FakeMessage(system_prompt), FakeMessage(user_prompt)]))
+    return schema.model_validate_json(reply.content)
+
+
+def test_lists_follow_the_prompt():
+    paragraphs = "\n\n".join(f"[{i}] Paragraph {i}." for i in range(1, 8))
+    reviews = _respond(ParagraphReviewBatch, paragraphs).reviews
+    titles = _respond(TitleSuggestionBatch, "Generate 30 distinct article titles.").titles
+
+    assert [review.index for review in reviews] == list(range(1, 8))
+    assert len(titles) == 30
+
+
+def test_compare_ignores_raw_throughput():
+    row = {"requests": 10, "throughput_rps": 1.0, "completed_ratio": 0.9,
+           "p50_ms": 100, "p95_ms": 200, "p99_ms": 300, "error_rate": 0.0}
+    fewer_arrivals = {**row, "requests": 6, "throughput_rps": 0.6}
+    backlog = {**row, "completed_ratio": 0.5}
+
+    assert compare({"x": fewer_arrivals}, {"x": row}, 0.2) == []
+    assert len(compare({"x": backlog}, {"x": row}, 0.2)) == 1
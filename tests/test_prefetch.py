@@ -0,0 +1,55 @@
+import asyncio
+import os
+
+import httpx
+import pytest
+
+from agents.llm_resilience import llm_stats
+from config.settings import settings
+from loadtest.fake_llm import install_fake_llm
+
+BUSINESS = {
+    "business_type": "SaaS", "product_service": "crm", "target_audience": "smb",
+    "niche_keywords": ["crm"], "calendar_days": 7, "posts_per_week": 2,
+}
+
+
+@pytest.mark.skipif("PREFETCH_ENABLED" in os.environ, reason="explicitly configured")
+def test_prefetch_is_opt_in():
+    assert settings.PREFETCH_ENABLED is False
+
+
+def test_ui_request_finds_prefetched_article(monkeypatch):
+    install_fake_llm(latency_scale=0.01)
+    monkeypatch.setattr(settings, "PREFETCH_ENABLED", True)
+    monkeypatch.setattr(settings, "PREFETCH_POLL_INTERVAL", 0.05)
+    from api.main import app, prefetch_scheduler
+
+    async def run():
+        prefetch_scheduler.start()
+        transport = httpx.ASGITransport(app=app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=None) as client:
+                plan_id = (await client.post("/generate-plan", json=BUSINESS)).json()["plan_id"]
+                for _ in range(200):
+                    plan = (await client.get(f"/plans/{plan_id}")).json()["data"]
+                    entry = plan["plan"]["content_schedule"][0]
+                    if entry["status"] not in ("planned", "generating"):
+                        break
+                    await asyncio.sleep(0.05)
+
+                # The planner labels entries "how-to", "guide", ...; the UI sends its own types
+                assert entry["content_type"] != "how_to_guide"
+                before = llm_stats.snapshot()["total"]["attempts"]
+                response = await client.post("/generate-article", json={
+                    "title": entry["title"], "keywords": entry["keywords"].split(", "),
+                    "content_type": "how_to_guide",
+                })
+                return entry, response, llm_stats.snapshot()["total"]["attempts"] - before
+        finally:
+            await prefetch_scheduler.stop()
+
+    entry, response, calls = asyncio.run(run())
+    assert entry["status"] == "ready"
+    assert response.json()["data"]["article"]["title"] == entry["title"]
+    assert calls == 0
@@ -0,0 +1,71 @@
+import asyncio
+
+from agents.quality_reviewer_agent import QualityReviewerAgent
+from config.settings import settings
+from models.schemas import BlogArticle, ParagraphReview, ParagraphReviewBatch
+
+
+def _article(content):
+    return BlogArticle(
+        title="Review test", meta_description="Test", content=content, keywords=["review"],
+        word_count=len(content.split()), readability_score=70, seo_score=50
+    )
+
+
+def test_failed_review_is_not_cached(monkeypatch):
+    reviewer = QualityReviewerAgent()
+    calls = []
+
+    async def structured(system_prompt, user_prompt, schema, task="default"):
+        calls.append(user_prompt)
+        if len(calls) == 1:
+            raise ValueError("No JSON object found in response")
+        return ParagraphReviewBatch(reviews=[
+            ParagraphReview(index=1, grammar_score=40, plagiarism_risk="High", issues=["Run-on sentence"])
+        ])
+
+    monkeypatch.setattr(reviewer, "_call_llm_structured", structured)
+    article = _article("A paragraph that only the failed-review test ever writes.")
+
+    first = asyncio.run(reviewer.execute(article))
+    second = asyncio.run(reviewer.execute(article))
+
+    assert len(calls) == 2
+    assert first.grammar_score == 85.0
+    assert second.grammar_score == 40
+    assert second.plagiarism_risk == "High"
+
+
+def test_density_revision_skips_short_dense_intro():
+    # The one-mention intro is the densest section but has nothing to trim
+    article = _article("SEO matters.\n\n## Tips\n\n" + "Good SEO needs SEO audits and SEO content. " * 5)
+
+    revisions = QualityReviewerAgent._plan_revisions(article, {"seo": 30.0})
+
+    instructions = {revision.index: revision.instructions for revision in revisions}
+    assert not any("'seo'" in instruction for instruction in instructions.get(0, []))
+    assert any(instruction.startswith("Use 'seo' at most") for instruction in instructions[1])
+
+
+def test_review_calls_are_merged_and_capped(monkeypatch):
+    monkeypatch.setattr(settings, "REVIEW_CHUNK_TOKENS", 100)
+    monkeypatch.setattr(settings, "REVIEW_MAX_CALLS", 3)
+    # One edited paragraph in each of four chunks fits a single call
+    edits = [{f"k{i}": "A short edited paragraph."} for i in range(4)]
+    full = [{f"k{i}": "word " * 300} for i in range(7)]
+
+    assert len(QualityReviewerAgent._merge_batches(edits)) == 1
+    merged = QualityReviewerAgent._merge_batches(full)
+    assert len(merged) == 3
+    assert [key for batch in merged for key in batch] == [f"k{i}" for i in range(7)]
+
+
+def test_low_article_readability_falls_back_to_hardest_section():
+    # Every section reads easily on its own, yet the article's score is below the threshold
+    content = "The cat sat. It was fun.\n\n## Tips\n\nWe ran. The sun was hot. Then we had a nap."
+    article = _article(content).model_copy(update={"readability_score": 50, "word_count": 1200})
+
+    revisions = QualityReviewerAgent._plan_revisions(article, {})
+
+    assert len(revisions) == 1
+    assert revisions[0].suggestions == [QualityReviewerAgent._readability_suggestion()]
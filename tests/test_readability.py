@@ -0,0 +1,31 @@
+import pytest
+
+from analysis.readability import score_batch
+
+INDICES = ("flesch_reading_ease", "flesch_kincaid_grade", "automated_readability_index", "coleman_liau_index")
+
+# Expected values computed with textstat 0.7.x, frozen so the dependency isn't needed
+TEXTSTAT = [
+    ("The cat sat on the mat. It was happy.", (109.21, -1.0, -4.1, -4.92)),
+    ("## Getting Started\n\nSearch engine optimization helps organic traffic grow steadily over time. "
+     "Measure results weekly!", (38.48, 9.8, 14.0, 17.88)),
+    ("Readability formulas approximate comprehension difficulty; unquestionably, polysyllabic "
+     "vocabulary increases estimated grade levels considerably.", (-102.47, 30.8, 33.3, 39.83)),
+    ("Short. Very short text here? Yes, indeed it is.\n\n- list item\n- another item", (100.95, 0.2, 2.5, 1.46)),
+    ("Don't over-think it: e-mail your customers, track conversions, and iterate... Quality beats "
+     "quantity, every single time.", (46.44, 8.8, 13.5, 14.46)),
+]
+
+
+def test_scores_match_textstat():
+    scores = score_batch(text for text, _ in TEXTSTAT)
+
+    for row, (_, expected) in enumerate(TEXTSTAT):
+        assert tuple(float(scores[index][row]) for index in INDICES) == pytest.approx(expected)
+
+
+def test_empty_text():
+    scores = score_batch([""])
+
+    # textstat agrees on the first three; its Coleman-Liau gives -15.81 for no words
+    assert tuple(float(scores[index][0]) for index in INDICES) == (206.84, -15.7, 0.0, 0.0)
@@ -0,0 +1,73 @@
+import asyncio
+
+from aiohttp import web
+
+from services.serp_client import SerpClient
+
+
+async def _serve(delay=0.0):
+    async def keywords(request):
+        await asyncio.sleep(delay)
+        body = await request.json()
+        return web.json_response({"results": [
+            {"keyword": kw, "search_volume": 100, "competition": 0.5} for kw in body["keywords"]
+        ]})
+
+    app = web.Application()
+    app.add_routes([web.post("/keywords", keywords)])
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def test_results_are_cached_in_memory_and_on_disk(tmp_path):
+    async def run():
+        runner, base = await _serve()
+        client = SerpClient(base, "key", str(tmp_path))
+        try:
+            first = await client.lookup(["Running Shoes", "trail shoes"])
+            # Results are handed out first; the disk write finishes in the background
+            await asyncio.gather(*client._batches)
+            assert not client._batches
+
+            def no_disk(keywords):
+                raise AssertionError("memory hits must not touch the disk cache")
+
+            client._read_cache = no_disk
+            again = await client.lookup(["running shoes"])
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+        # A fresh client (e.g. after a restart) finds the entries on disk
+        fresh = SerpClient("http://127.0.0.1:9", "key", str(tmp_path))
+        from_disk = await fresh.lookup(["trail shoes"])
+        await fresh.close()
+        return first, again, from_disk, client.stats
+
+    first, again, from_disk, stats = asyncio.run(run())
+    assert first["Running Shoes"].search_volume == 100
+    assert again["running shoes"] == first["Running Shoes"]
+    assert from_disk["trail shoes"].competition == 0.5
+    assert stats["requests"] == 1
+
+
+def test_close_cancels_in_flight_batches(tmp_path):
+    async def run():
+        runner, base = await _serve(delay=5)
+        client = SerpClient(base, "key", str(tmp_path))
+        lookup = asyncio.ensure_future(client.lookup(["slow keyword"]))
+        while not client._batches:
+            await asyncio.sleep(0.01)
+        await client.close()
+        pending = set(client._batches)
+        await asyncio.gather(lookup, return_exceptions=True)
+        await runner.cleanup()
+        return pending, client._in_flight
+
+    pending, in_flight = asyncio.run(run())
+    assert not pending
+    assert not in_flight
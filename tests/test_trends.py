@@ -0,0 +1,61 @@
+from datetime import date, timedelta
+
+import numpy as np
+
+from analysis.trends import MIN_CAPACITY, TrendStore
+
+
+def _week(n):
+    return date(2026, 1, 5) + timedelta(weeks=n)
+
+
+def test_new_keywords_reuse_reserved_columns(tmp_path):
+    store = TrendStore(str(tmp_path))
+    store.append_week(_week(0), {"crm software": 100, "crm": 50})
+    store.append_week(_week(1), {"crm software": 120, "sales crm": 10})
+    store.append_week(_week(2), {"crm": 70})
+
+    assert store.capacity == MIN_CAPACITY
+    assert (tmp_path / "volumes.f32").stat().st_size == 3 * MIN_CAPACITY * 4
+    matrix = store.matrix()
+    ids = store.ids
+    assert matrix.shape == (3, 3)
+    np.testing.assert_array_equal(matrix[:, ids["crm software"]], [100, 120, 0])
+    np.testing.assert_array_equal(matrix[:, ids["crm"]], [50, 0, 70])
+    np.testing.assert_array_equal(matrix[:, ids["sales crm"]], [0, 10, 0])
+
+
+def test_capacity_doubles_and_keeps_history(tmp_path):
+    store = TrendStore(str(tmp_path))
+    store.append_week(_week(0), {"seed": 5})
+    many = {f"keyword {i}": i for i in range(MIN_CAPACITY + 10)}
+    store.append_week(_week(1), many)
+
+    assert store.capacity == 2 * MIN_CAPACITY
+    # A fresh reader sees the same layout
+    reopened = TrendStore(str(tmp_path))
+    matrix = reopened.matrix()
+    assert matrix.shape == (2, MIN_CAPACITY + 11)
+    np.testing.assert_array_equal(matrix[:, reopened.ids["seed"]], [5, 0])
+    np.testing.assert_array_equal(matrix[:, reopened.ids["keyword 7"]], [0, 7])
+
+
+def test_widen_keeps_stale_readers_on_a_consistent_layout(tmp_path):
+    writer = TrendStore(str(tmp_path))
+    writer.append_week(_week(0), {"seed": 5})
+    reader = TrendStore(str(tmp_path))
+    reader.refresh()
+    np.testing.assert_array_equal(reader.matrix()[:, 0], [5])
+    old_matrix = reader.matrix()
+
+    writer.append_week(_week(1), {f"keyword {i}": i for i in range(MIN_CAPACITY + 10)})
+
+    # The widened matrix is a new generation; the old file is gone, not rewritten in place
+    assert writer.generation == 1
+    assert not (tmp_path / "volumes.f32").exists()
+    np.testing.assert_array_equal(old_matrix[:, 0], [5])
+    # A reader still holding the old layout recovers instead of using the old row width
+    matrix = reader.matrix()
+    assert matrix.shape == (2, MIN_CAPACITY + 11)
+    np.testing.assert_array_equal(matrix[:, reader.ids["seed"]], [5, 0])
+    np.testing.assert_array_equal(matrix[:, reader.ids["keyword 7"]], [0, 7])
@@ -0,0 +1,40 @@
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+ArticleKey = Tuple[str, Tuple[str, ...]]
+
+
+class ArticleStore:
+    """Bounded in-memory store of generated articles, keyed by title and keywords."""
+
+    def __init__(self, max_articles: int = 1000):
+        self.max_articles = max_articles
+        self._articles: "OrderedDict[ArticleKey, Dict[str, Any]]" = OrderedDict()
+
+    @staticmethod
+    def key(title: str, keywords: List[str]) -> ArticleKey:
+        # Case and keyword order don't make a different article. Neither does the
+        # content type: the planner's labels ("how-to") and the UI's ("how_to_guide")
+        # are different vocabularies for the same scheduled article
+        return (
+            title.strip().lower(),
+            tuple(sorted(kw.strip().lower() for kw in keywords))
+        )
+
+    def add(self, key: ArticleKey, result: Dict[str, Any]):
+        self._articles[key] = result
+        self._articles.move_to_end(key)
+        if len(self._articles) > self.max_articles:
+            self._articles.popitem(last=False)
+
+    def get(self, key: ArticleKey) -> Optional[Dict[str, Any]]:
+        result = self._articles.get(key)
+        if result is not None:
+            self._articles.move_to_end(key)
+        return result
+
+    def __contains__(self, key: ArticleKey) -> bool:
+        return key in self._articles
+
+    def __len__(self) -> int:
+        return len(self._articles)
@@ -0,0 +1,28 @@
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+class PlanStore:
+    """Bounded in-memory store of generated plans, most recently used kept."""
+
+    def __init__(self, max_plans: int = 500):
+        self.max_plans = max_plans
+        self._plans: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def add(self, plan: Dict[str, Any]) -> str:
+        plan_id = uuid.uuid4().hex
+        self._plans[plan_id] = plan
+        if len(self._plans) > self.max_plans:
+            self._plans.popitem(last=False)
+        return plan_id
+
+    def peek(self, plan_id: str) -> Optional[Dict[str, Any]]:
+        """Like `get`, without counting as a use (background readers shouldn't keep plans alive)."""
+        return self._plans.get(plan_id)
+
+    def get(self, plan_id: str) -> Optional[Dict[str, Any]]:
+        plan = self._plans.get(plan_id)
+        if plan is not None:
+            self._plans.move_to_end(plan_id)
+        return plan
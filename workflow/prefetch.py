@@ -0,0 +1,166 @@
+"""Write planned calendar articles ahead of their publish dates.
+
+Every "planned" entry of a stored plan is queued by publish date. A single
+background worker takes the earliest entry once it falls within
+PREFETCH_HORIZON_DAYS, but only while interactive traffic is low and the
+day's LLM call budget lasts, and records its progress in the entry's
+`status` ("generating", then "ready" or "failed"). Finished articles go
+into an ArticleStore, where /generate-article finds them.
+"""
+import asyncio
+import heapq
+import itertools
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from agents.llm_resilience import metered
+from config.settings import settings
+from workflow.article_store import ArticleKey, ArticleStore
+from workflow.plan_store import PlanStore
+from workflow.seo_workflow import SEOWorkflow
+
+
+class PrefetchScheduler:
+    def __init__(self, workflow: SEOWorkflow, plan_store: PlanStore, article_store: ArticleStore,
+                 busy: Callable[[], bool]):
+        self.workflow = workflow
+        self.plan_store = plan_store
+        self.article_store = article_store
+        self._busy = busy  # True while interactive traffic should have the LLM to itself
+        self._queue: List[Tuple[str, int, str, int]] = []  # (publish date, seq, plan id, entry index)
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._running: Dict[ArticleKey, asyncio.Task] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._budget_day = date.today()
+        self.budget_used = 0
+        self._article_cost = 0  # LLM attempts the last article took
+        self.state = "idle"
+        self.stats = {"generated": 0, "failed": 0, "skipped": 0, "served": 0}
+
+    def add_plan(self, plan_id: str, plan: Dict[str, Any]):
+        if not settings.PREFETCH_ENABLED:
+            return
+        for index, entry in enumerate(plan["plan"]["content_schedule"]):
+            if entry.get("status") == "planned":
+                heapq.heappush(self._queue, (entry["date"], next(self._seq), plan_id, index))
+        self._wakeup.set()
+
+    def has(self, title: str, keywords: List[str]) -> bool:
+        """Whether `lookup` will return an article (stored, or being written right now)."""
+        key = self.article_store.key(title, keywords)
+        return key in self.article_store or key in self._running
+
+    async def lookup(self, title: str, keywords: List[str]) -> Optional[Dict[str, Any]]:
+        """A prefetched article for this title and keywords, waiting for it if it is being written right now."""
+        key = self.article_store.key(title, keywords)
+        result = self.article_store.get(key)
+        if result is None and key in self._running:
+            try:
+                # Shielded: an impatient client must not cancel the background work
+                result = await asyncio.shield(self._running[key])
+            except Exception:
+                result = None
+        if result is not None:
+            self.stats["served"] += 1
+        return result
+
+    def start(self):
+        if settings.PREFETCH_ENABLED and (self._task is None or self._task.done()):
+            self._stopping = False
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            # The flag ends the loop even if the cancel is lost: on Python 3.11, wait_for
+            # (used by the LLM calls) drops a cancel that arrives as its inner call completes
+            self._stopping = True
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        self._roll_budget()
+        return {
+            "state": self.state,
+            "queued": len(self._queue),
+            "budget_used": self.budget_used,
+            "budget": settings.PREFETCH_DAILY_LLM_CALLS,
+            **self.stats
+        }
+
+    def _roll_budget(self):
+        today = date.today()
+        if today != self._budget_day:
+            self._budget_day, self.budget_used = today, 0
+
+    def _next_state(self) -> str:
+        horizon = (date.today() + timedelta(days=settings.PREFETCH_HORIZON_DAYS)).isoformat()
+        if not self._queue or self._queue[0][0] > horizon:
+            return "idle"
+        if self._busy():
+            return "paused_traffic"
+        self._roll_budget()
+        # Don't start an article the rest of the budget probably can't pay for
+        if self.budget_used + max(self._article_cost, 1) > settings.PREFETCH_DAILY_LLM_CALLS:
+            return "paused_budget"
+        return "working"
+
+    async def _run(self):
+        while not self._stopping:
+            self.state = self._next_state()
+            if self.state != "working":
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), settings.PREFETCH_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            _, _, plan_id, index = heapq.heappop(self._queue)
+            await self._prefetch(plan_id, index)
+
+    async def _prefetch(self, plan_id: str, index: int):
+        plan = self.plan_store.peek(plan_id)
+        if plan is None:
+            # Evicted from the plan store; nobody can ask for its articles any more
+            self.stats["skipped"] += 1
+            return
+        entry = plan["plan"]["content_schedule"][index]
+        keywords = entry["keywords"].split(", ")
+        key = self.article_store.key(entry["title"], keywords)
+        if key in self.article_store:
+            entry["status"] = "ready"
+            return
+
+        entry["status"] = "generating"
+        task = asyncio.ensure_future(self._generate(entry, keywords, plan))
+        self._running[key] = task
+        try:
+            result = await task
+        except asyncio.CancelledError:
+            entry["status"] = "planned"
+            raise
+        except Exception:
+            entry["status"] = "failed"
+            self.stats["failed"] += 1
+        else:
+            self.article_store.add(key, result)
+            entry["status"] = "ready"
+            self.stats["generated"] += 1
+        finally:
+            del self._running[key]
+
+    async def _generate(self, entry: Dict[str, str], keywords: List[str], plan: Dict[str, Any]) -> Dict[str, Any]:
+        with metered() as meter:
+            try:
+                result = await self.workflow.generate_article(
+                    entry["title"], keywords, entry["content_type"],
+                    context=self.workflow.article_context(plan)
+                )
+            finally:
+                self._roll_budget()
+                self.budget_used += meter.attempts
+                self._article_cost = meter.attempts
+        result["scheduled_date"] = entry["date"]
+        return result
@@ -1,5 +1,8 @@
 import asyncio
-from typing import Dict, Any
+import logging
+from collections import deque
+from itertools import islice
+from typing import Any, AsyncIterator, Dict, Optional, Tuple, Union
 from models.schemas import *
 from agents.market_research_agent import MarketResearchAgent
 from agents.seo_strategist_agent import SEOStrategistAgent
@@ -7,6 +10,10 @@ from agents.content_planner_agent import ContentPlannerAgent
 from agents.blog_writer_agent import BlogWriterAgent
 from agents.quality_reviewer_agent import QualityReviewerAgent
 from agents.performance_estimator_agent import PerformanceEstimatorAgent
+from agents.timeline import stage
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
 
 class SEOWorkflow:
     def __init__(self):
@@ -21,52 +28,192 @@ class SEOWorkflow:
         """Generate complete SEO content plan"""
         
         # Step 1: Market Research
-        research_result = await self.market_research_agent.execute(business_input)
+        with stage("market_research"):
+            research_result = await self.market_research_agent.execute(business_input)
         
         # Step 2: SEO Strategy
-        seo_strategy = await self.seo_strategist_agent.execute(research_result)
+        with stage("seo_strategy"):
+            seo_strategy = await self.seo_strategist_agent.execute(research_result)
         
         # Step 3: Content Planning
-        content_plan = await self.content_planner_agent.execute(seo_strategy, days=7)
+        with stage("content_planning"):
+            content_plan = await self.content_planner_agent.execute(
+                seo_strategy,
+                days=business_input.calendar_days or 7,
+                posts_per_week=business_input.posts_per_week or 7,
+                publish_weekdays=business_input.publish_weekdays
+            )
         
         return {
-            "research": research_result.dict(),
-            "strategy": seo_strategy.dict(),
-            "plan": content_plan.dict()
+            "research": research_result.model_dump(),
+            "strategy": seo_strategy.model_dump(),
+            "plan": content_plan.model_dump()
         }
     
     async def generate_article(self, title: str, keywords: List[str], 
-                             content_type: str = "blog_post") -> Dict[str, Any]:
+                             content_type: str = "blog_post",
+                             pipelined: Optional[bool] = None,
+                             context: Optional[ArticleContext] = None) -> Dict[str, Any]:
         """Generate a single article with quality review and performance estimate"""
         
-        # Step 1: Write Article
-        article = await self.blog_writer_agent.execute(title, keywords, content_type)
+        if pipelined is None:
+            pipelined = settings.ARTICLE_PIPELINE
+        meta_description, keyword_metrics = self._reusable_artifacts(title, keywords, context)
+        
+        if pipelined:
+            # Steps 1-2 overlap: sections are reviewed while later ones are still streaming
+            with stage("write_and_review"):
+                article = await self._write_and_review(title, keywords, content_type, meta_description)
+        else:
+            # Step 1: Write Article
+            with stage("write_article"):
+                article = await self.blog_writer_agent.execute(
+                    title, keywords, content_type, meta_description=meta_description
+                )
         
-        # Step 2: Quality Review
-        quality_report = await self.quality_reviewer_agent.execute(article)
+        # Step 2: Quality Review (pipelined sections come from the paragraph cache)
+        with stage("quality_review"):
+            quality_report = await self.quality_reviewer_agent.execute(article)
         
         # Step 3: Performance Estimate
-        performance_estimate = await self.performance_estimator_agent.execute(
-            article, quality_report
-        )
+        with stage("performance_estimate"):
+            performance_estimate = await self.performance_estimator_agent.execute(
+                article, quality_report, keyword_metrics
+            )
         
         return {
-            "article": article.dict(),
-            "quality_report": quality_report.dict(),
-            "performance_estimate": performance_estimate.dict()
+            "article": article.model_dump(),
+            "quality_report": quality_report.model_dump(),
+            "performance_estimate": performance_estimate.model_dump()
+        }
+    
+    async def revise_article(self, article: BlogArticle,
+                             quality_report: Optional[QualityReport] = None,
+                             performance_estimate: Optional[PerformanceEstimate] = None) -> Dict[str, Any]:
+        """Rewrite only the sections behind the report's suggestions, then re-score"""
+        
+        # Step 1: Quality Review (only paragraphs missing from the cache are reviewed)
+        if quality_report is None:
+            with stage("quality_review"):
+                quality_report = await self.quality_reviewer_agent.execute(article)
+        
+        # Step 2: Revise the responsible sections
+        revisions = await self.quality_reviewer_agent.plan_revisions(article, quality_report)
+        if revisions:
+            with stage("revise_sections"):
+                article = await self.blog_writer_agent.revise(article, revisions)
+            # Step 3: Re-review; unchanged sections come from the paragraph cache
+            with stage("quality_review"):
+                quality_report = await self.quality_reviewer_agent.execute(article)
+        elif quality_report.suggestions:
+            logger.info("No section could be traced to the suggestions for '%s'; article left unrevised",
+                        article.title)
+        
+        # Step 4: Performance Estimate (keywords are unchanged, so is their competition)
+        with stage("performance_estimate"):
+            performance_estimate = await self.performance_estimator_agent.execute(
+                article, quality_report,
+                known_competition=performance_estimate.competition_level if performance_estimate else None
+            )
+        
+        return {
+            "article": article.model_dump(),
+            "quality_report": quality_report.model_dump(),
+            "performance_estimate": performance_estimate.model_dump(),
+            "revisions": [revision.model_dump() for revision in revisions]
+        }
+    
+    @staticmethod
+    def article_context(plan: Dict[str, Any]) -> ArticleContext:
+        """Artifacts from a generated plan that calendar articles can reuse"""
+        strategy, research = plan["strategy"], plan["research"]
+        return ArticleContext(
+            meta_descriptions={
+                title.lower(): description
+                for title, description in zip(strategy["suggested_titles"], strategy["meta_descriptions"])
+            },
+            keyword_metrics={
+                keyword.lower(): metrics
+                for keyword, metrics in research.get("keyword_metrics", {}).items()
+            }
+        )
+    
+    def _reusable_artifacts(self, title: str, keywords: List[str], context: Optional[ArticleContext]
+                            ) -> Tuple[Optional[str], Optional[Dict[str, KeywordMetrics]]]:
+        if context is None:
+            return None, None
+        keyword_metrics = {
+            kw: context.keyword_metrics[kw.lower()] for kw in keywords if kw.lower() in context.keyword_metrics
         }
+        return context.meta_descriptions.get(title.lower()), keyword_metrics or None
+    
+    async def _write_and_review(self, title: str, keywords: List[str], content_type: str,
+                                meta_description: Optional[str] = None) -> BlogArticle:
+        reviews = []
+        
+        def review_section(section: str):
+            reviews.append(asyncio.ensure_future(
+                self.quality_reviewer_agent.review_section(section, keywords)
+            ))
+        
+        try:
+            article = await self.blog_writer_agent.execute_pipelined(
+                title, keywords, content_type, on_section=review_section,
+                meta_description=meta_description
+            )
+            results = await asyncio.gather(*reviews, return_exceptions=True)
+        finally:
+            for review in reviews:
+                review.cancel()
+        for section_number, result in enumerate(results, start=1):
+            # The section's paragraphs stay out of the cache, so the final review retries them
+            if isinstance(result, Exception):
+                logger.warning("Early review of section %d of '%s' failed: %s", section_number, title, result)
+        return article
     
-    async def generate_calendar_articles(self, content_plan: ContentPlan) -> List[Dict[str, Any]]:
-        """Generate articles for entire content calendar"""
+    async def generate_calendar_articles(self, plan: Dict[str, Any],
+                                         concurrency: int = 4) -> List[Dict[str, Any]]:
+        """Generate articles for a generated plan's entire calendar, reusing its artifacts"""
         
         articles = []
-        for scheduled_content in content_plan.content_schedule:
-            title = scheduled_content["title"]
-            keywords = scheduled_content["keywords"].split(", ")
-            content_type = scheduled_content["content_type"]
-            
-            article_data = await self.generate_article(title, keywords, content_type)
+        generated = self.iter_calendar_articles(
+            plan["plan"]["content_schedule"], concurrency, context=self.article_context(plan)
+        )
+        async for scheduled_content, article_data in generated:
+            if isinstance(article_data, Exception):
+                await generated.aclose()
+                raise article_data
             article_data["scheduled_date"] = scheduled_content["date"]
             articles.append(article_data)
         
         return articles
+    
+    async def iter_calendar_articles(self, content_schedule: List[Dict[str, Any]], concurrency: int = 4,
+                                     context: Optional[ArticleContext] = None) -> AsyncIterator[Tuple[Dict[str, Any], Union[Dict[str, Any], Exception]]]:
+        """Yield (schedule entry, generate_article result or error) in calendar order, writing a few articles ahead"""
+        
+        entries = iter(content_schedule)
+        window = deque()
+        
+        def start(entry: Dict[str, Any]):
+            return asyncio.ensure_future(self.generate_article(
+                entry["title"], entry["keywords"].split(", "), entry["content_type"], context=context
+            ))
+        
+        try:
+            for entry in islice(entries, max(1, concurrency)):
+                window.append((entry, start(entry)))
+            while window:
+                entry, task = window.popleft()
+                try:
+                    result = await task
+                except Exception as e:
+                    result = e
+                # Refill the window before handing the article over
+                next_entry = next(entries, None)
+                if next_entry is not None:
+                    window.append((next_entry, start(next_entry)))
+                yield entry, result
+        finally:
+            for _, task in window:
+                task.cancel()